@@ -1,19 +1,14 @@
-import requests
+import os
+import sys
 import pandas as pd
 from openpyxl import load_workbook
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
 
 
-
-def fetch_nba_data(url, headers, params):
-    response = requests.get(url, headers=headers, params=params)
-    data = response.json()
-    return data
-
 def process_data(data, min_attempts):
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
+    df = nba_http.process_data(data)
     df_filtered = df[(df['FG3A'] >= min_attempts)]
     return df_filtered
 
@@ -72,24 +67,8 @@ def generate_summary_tab(excel_filename):
     else:
         print("No top 10 ranks found.")
 
-# Common headers and URL
+# Stats URL
 url = "https://stats.nba.com/stats/leaguedashplayerptshot"
-headers = {
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Not A Brand\";v=\"99\", \"Google Chrome\";v=\"121\", \"Chromium\";v=\"121\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-}
 
 params = {
     "CloseDefDistRange": "",
@@ -139,6 +118,6 @@ params2 = params.copy()
 params2['LastNGames'] = "10"  # Adjusting the last N games parameter
 
 # Fetch and process the first set of data
-data1 = fetch_nba_data(url, headers, params)
+data1 = nba_http.fetch_nba_data(url, params)
 df_filtered1 = process_data(data1, min_attempts=200)
 save_to_excel(df_filtered1, '/Users/tonysantoorjian/Documents/3pt_stats.xlsx', 'Sheet1')
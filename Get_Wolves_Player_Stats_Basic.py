@@ -3,6 +3,14 @@ import datetime
 import pandas as pd
 import time
 from nba_api.stats.endpoints import teamplayerdashboard
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import install_nba_api_session
+
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
 
 
 def get_current_season():
@@ -0,0 +1,141 @@
+"""
+Concurrent fetcher for parameter-grid scrapes (play types x windows x player/team...).
+
+Jobs are (key, url, params) triples. They run on a thread pool driven by asyncio,
+with at most MAX_PER_HOST requests in flight per host, and every request still
+goes through the shared pooled session and its host rate limiter. Results come
+back in the same order as the jobs; a failed job is reported on its result
+instead of aborting the rest of the batch.
+
+    from common.fetch_engine import FetchJob, fetch_all
+
+    jobs = [FetchJob(pt, url, {**params, 'PlayType': pt}) for pt in play_types]
+    for result in fetch_all(jobs):
+        if result.ok:
+            frames[result.key] = result.df
+        else:
+            print(f"{result.key} failed: {result.error}")
+
+Inside a running event loop, use `await fetch_all_async(jobs)` instead.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from . import nba_http
+from .resultsets import loads
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight per host; stats.nba.com starts dropping connections well
+# before the connection pool is full
+MAX_PER_HOST = {
+    'stats.nba.com': 4,
+    'www.basketball-reference.com': 1,
+}
+DEFAULT_MAX_PER_HOST = 8
+
+
+class FetchJob:
+    """One request of a grid; key identifies it in the results (e.g. a tuple of grid values)"""
+
+    def __init__(self, key, url, params=None, result_set=0):
+        self.key = key
+        self.url = url
+        self.params = dict(params or {})
+        self.result_set = result_set
+
+    @property
+    def host(self):
+        return urlsplit(self.url).hostname
+
+
+class FetchResult:
+    """Outcome of a job: the decoded JSON and its DataFrame, or the error that stopped it"""
+
+    def __init__(self, job, data=None, df=None, error=None):
+        self.job = job
+        self.data = data
+        self.df = df
+        self.error = error
+
+    @property
+    def key(self):
+        return self.job.key
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _run_job(job):
+    """Blocking fetch + parse, executed on a worker thread"""
+    try:
+        response = nba_http.get(job.url, params=job.params)
+        response.raise_for_status()
+        data = loads(response.content)
+    except requests.exceptions.RequestException as e:
+        return FetchResult(job, error=f"request failed: {e}")
+    except ValueError as e:
+        return FetchResult(job, error=f"JSON decode error: {e}")
+
+    if not data.get('resultSets'):
+        return FetchResult(job, data=data, error="no resultSets in response")
+    try:
+        df = nba_http.process_data(data, job.result_set)
+    except (KeyError, IndexError, ValueError) as e:
+        return FetchResult(job, data=data, error=f"unexpected resultSets layout: {e}")
+    return FetchResult(job, data=data, df=df)
+
+
+async def _fetch_all(jobs, max_per_host):
+    loop = asyncio.get_running_loop()
+    limits = {job.host: max_per_host.get(job.host, DEFAULT_MAX_PER_HOST) for job in jobs}
+    semaphores = {host: asyncio.Semaphore(limit) for host, limit in limits.items()}
+
+    workers = sum(limits.values())
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch') as executor:
+        async def run(job):
+            async with semaphores[job.host]:
+                try:
+                    return await loop.run_in_executor(executor, _run_job, job)
+                except Exception as e:  # keep the batch going whatever happens to one job
+                    logger.exception(f"Job {job.key} crashed")
+                    return FetchResult(job, error=f"{type(e).__name__}: {e}")
+
+        return await asyncio.gather(*(run(job) for job in jobs))
+
+
+async def fetch_all_async(jobs, max_per_host=None):
+    """
+    Fetch every job concurrently and return one FetchResult per job, in job order.
+
+    max_per_host overrides MAX_PER_HOST for this batch. Overall throughput is still
+    capped by the host limits in rate_limiter, so raising concurrency only helps
+    while requests are waiting on the network rather than on the token bucket.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    limits = dict(MAX_PER_HOST, **(max_per_host or {}))
+    results = await _fetch_all(jobs, limits)
+
+    failed = [r for r in results if not r.ok]
+    if failed:
+        logger.warning(f"{len(failed)} of {len(results)} jobs failed")
+    return results
+
+
+def fetch_all(jobs, max_per_host=None):
+    """
+    Blocking fetch_all_async() for scripts. Code already running in an event loop
+    (e.g. the live scheduler) must await fetch_all_async() instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_all_async(jobs, max_per_host))
+    raise RuntimeError("fetch_all() called from a running event loop; await fetch_all_async() instead")
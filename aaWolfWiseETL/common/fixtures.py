@@ -0,0 +1,147 @@
+"""
+Record/replay of HTTP traffic so the ETL scripts can run without the network.
+
+Set WOLFWISE_HTTP_MODE before running a script:
+
+    WOLFWISE_HTTP_MODE=record python in_game_stats.py   # live run, every response saved
+    WOLFWISE_HTTP_MODE=replay python in_game_stats.py   # served from the fixtures, no network
+
+Everything that goes through the shared sessions is covered: direct stats.nba.com
+and cdn.nba.com calls, nba_api endpoints (once install_nba_api_session() has been
+called), basketball-reference pages and the nbaapi.com GraphQL posts. Replay skips
+the rate limiter and the retry policy, so a script runs at parse/transform speed.
+
+Each exchange is stored as one gzip file named after a hash of the method, the URL
+with its query parameters sorted, the request body and any conditional-GET
+validators, so a revalidating poll's 304 never replaces the 200 it revalidates. The file holds one line
+of JSON metadata (status, headers, url) followed by the decoded body.
+"""
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+LIVE = 'live'
+RECORD = 'record'
+REPLAY = 'replay'
+
+DEFAULT_FIXTURE_DIR = os.getenv(
+    'WOLFWISE_FIXTURE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.http_fixtures')
+)
+
+# Conditional request headers; a 304 is only the answer to a request that sent them
+_VALIDATOR_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+# The stored body is already decoded, so these no longer describe it
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+def get_mode():
+    mode = os.getenv('WOLFWISE_HTTP_MODE', LIVE).lower()
+    if mode not in (LIVE, RECORD, REPLAY):
+        raise ValueError(f"WOLFWISE_HTTP_MODE must be one of live, record, replay (got {mode!r})")
+    return mode
+
+
+class FixtureMissingError(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def request_key(method, url, body=None, headers=None):
+    """Stable key for a request and its validators; query parameter order does not matter"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+    digest = hashlib.sha1(f"{method.upper()} {normalized}".encode('utf-8'))
+    if body:
+        digest.update(body if isinstance(body, bytes) else body.encode('utf-8'))
+    for name in _VALIDATOR_HEADERS:
+        value = (headers or {}).get(name)
+        if value:
+            digest.update(f"\n{name}: {value}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, fixture_dir=DEFAULT_FIXTURE_DIR):
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def _path(self, request):
+        key = request_key(request.method, request.url, request.body, request.headers)
+        return os.path.join(self.fixture_dir, f"{key}.gz")
+
+    def save(self, request, response):
+        """Store a response for a request; the body is read (and kept) on the response"""
+        meta = {
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+        }
+        path = self._path(request)
+        try:
+            with gzip.open(path + '.tmp', 'wb') as f:
+                f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                f.write(response.content)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning(f"Could not record fixture for {request.url}: {e}")
+
+    def load(self, request):
+        """Rebuild the recorded response for a request, or None if there isn't one"""
+        try:
+            with gzip.open(self._path(request), 'rb') as f:
+                meta_line = f.readline()
+                body = f.read()
+        except FileNotFoundError:
+            return None
+
+        meta = json.loads(meta_line)
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = meta.get('reason')
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that answers every request from the fixture store"""
+
+    def __init__(self, store, *args, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        response = self.store.load(request)
+        if response is None:
+            raise FixtureMissingError(f"No recorded fixture for {request.method} {request.url}")
+        response.connection = self
+        return response
+
+
+_default_store = None
+
+
+def get_default_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = FixtureStore()
+    return _default_store
@@ -0,0 +1,175 @@
+"""
+Immutable local archive of completed games.
+
+A final game's play-by-play never changes, so it is downloaded once and frozen
+into a Parquet file partitioned by season and game:
+
+    .game_archive/season=2023-24/game_id=0022300001/pbp.parquet
+
+Season-level analyses ask the archive for a list of game IDs; games already
+archived are read from disk and only the missing ones are fetched (concurrently,
+through the shared cdn.nba.com session) and archived before being returned. Once
+the archive is warm a full-season play-by-play analysis makes no network calls.
+Games still in progress are returned but not archived.
+
+    from common.game_archive import get_default_archive
+
+    df = get_default_archive().load_pbp(game_ids)
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from . import nba_http
+from .fetch_engine import DEFAULT_MAX_PER_HOST, MAX_PER_HOST
+from .resultsets import loads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.getenv(
+    'WOLFWISE_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.game_archive')
+)
+
+PBP_URL = "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
+
+
+def season_for_game_id(game_id):
+    """'0022300001' -> '2023-24' (digits 4-5 of a game ID are the season's start year)"""
+    start = 2000 + int(str(game_id).zfill(10)[3:5])
+    return f"{start}-{str(start + 1)[2:]}"
+
+
+def is_final_pbp(actions):
+    """A play-by-play feed is final once it holds the 'game end' action"""
+    return any(a.get('actionType') == 'game' and a.get('subType') == 'end' for a in reversed(actions))
+
+
+def _to_cell(value):
+    # Parquet columns need one type; nested values (qualifiers, personIdsFilter) are kept as JSON
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _cells(df):
+    """The frame with its object columns converted the way they are stored"""
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].map(_to_cell)
+    return df
+
+
+def write_parquet(df, path):
+    """Write a frame of feed records to Parquet atomically; object columns are stored as strings"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df = _cells(df)
+    df.to_parquet(path + '.tmp', index=False, compression='zstd')
+    os.replace(path + '.tmp', path)
+
+
+def actions_frame(game_id, actions):
+    """
+    Play-by-play actions as a DataFrame with typed scores and the game ID, with
+    the same cell types as an archived game read back from disk
+    """
+    df = _cells(pd.DataFrame(actions))
+    for column in ('scoreHome', 'scoreAway'):
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    df['gameid'] = str(game_id).zfill(10)
+    return df
+
+
+class GameArchive:
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self._lock = threading.Lock()
+
+    def path(self, game_id, kind='pbp'):
+        game_id = str(game_id).zfill(10)
+        return os.path.join(self.archive_dir, f"season={season_for_game_id(game_id)}",
+                            f"game_id={game_id}", f"{kind}.parquet")
+
+    def has(self, game_id, kind='pbp'):
+        return os.path.exists(self.path(game_id, kind))
+
+    def write_pbp(self, game_id, actions):
+        """Freeze a final game's actions; an archived game is never rewritten"""
+        path = self.path(game_id)
+        with self._lock:
+            if os.path.exists(path):
+                return False
+            write_parquet(actions_frame(game_id, actions), path)
+        logger.info(f"Archived play-by-play for {game_id}")
+        return True
+
+    def read_pbp(self, game_id):
+        return pd.read_parquet(self.path(game_id))
+
+    def fetch_pbp(self, game_id):
+        """Download a game's play-by-play, archiving it if the game is final; returns the frame"""
+        game_id = str(game_id).zfill(10)
+        response = nba_http.get(PBP_URL.format(game_id=game_id))
+        response.raise_for_status()
+        actions = loads(response.content)['game']['actions']
+        if is_final_pbp(actions):
+            self.write_pbp(game_id, actions)
+        return actions_frame(game_id, actions)
+
+    def fetch_missing(self, game_ids):
+        """
+        Fetch (and archive, once final) the games not archived yet, concurrently
+        through the shared cdn.nba.com session. Returns {game_id: frame} for the
+        games fetched; failures are logged and skipped.
+        """
+        missing = [g for g in (str(g).zfill(10) for g in game_ids) if not self.has(g)]
+        fetched = {}
+        if not missing:
+            return fetched
+        logger.info(f"Fetching play-by-play for {len(missing)} games not archived yet")
+        workers = MAX_PER_HOST.get('cdn.nba.com', DEFAULT_MAX_PER_HOST)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='archive') as executor:
+            futures = {g: executor.submit(self.fetch_pbp, g) for g in missing}
+            for game_id, future in futures.items():
+                try:
+                    fetched[game_id] = future.result()
+                except Exception as e:
+                    logger.warning(f"Could not fetch play-by-play for {game_id}: {e}")
+        return fetched
+
+    def load_pbp(self, game_ids, fetch_missing=True):
+        """
+        Play-by-play for many games in one frame (game order preserved, 'gameid' column).
+
+        Archived games are read from disk; the rest are fetched and archived unless
+        fetch_missing is False. Games that fail to download are logged and skipped.
+        """
+        game_ids = [str(g).zfill(10) for g in game_ids]
+        fetched = self.fetch_missing(game_ids) if fetch_missing else {}
+
+        frames = []
+        for game_id in game_ids:
+            if game_id in fetched:
+                frames.append(fetched[game_id])
+            elif self.has(game_id):
+                frames.append(self.read_pbp(game_id))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+_default_archive = None
+
+
+def get_default_archive():
+    global _default_archive
+    if _default_archive is None:
+        _default_archive = GameArchive()
+    return _default_archive
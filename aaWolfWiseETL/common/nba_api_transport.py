@@ -0,0 +1,165 @@
+"""
+Process-wide transport for every nba_api stats endpoint.
+
+install() patches NBAStatsHTTP.send_api_request once, so every endpoint class
+(LeagueDashPlayerStats, PlayerCareerStats, PlayerGameLog, CommonTeamRoster,
+LeagueDashLineups, TeamGameLogs, ...) goes through:
+
+- our pooled, rate-limited and retried stats.nba.com session;
+- a round-robin proxy pool, so concurrent calls spread across exits. Proxies come
+  from NBA_API_PROXIES (comma-separated) or PROXY_URL;
+- an in-memory TTL cache keyed by endpoint and parameters. Identical calls made
+  at the same time share a single request, so a run never fetches the same data
+  twice.
+
+Scripts don't call this directly; nba_http.install_nba_api_session() does.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+
+from . import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds a successful response is reused; long enough to cover one ETL run
+DEFAULT_TTL = 15 * 60
+
+# Per-exit limit, scaled up by install() when several proxies are configured
+_STATS_LIMIT = rate_limiter.HOST_LIMITS['stats.nba.com']
+
+
+def proxies_from_env():
+    raw = os.getenv('NBA_API_PROXIES') or os.getenv('PROXY_URL') or ''
+    return [p.strip() for p in raw.split(',') if p.strip()]
+
+
+class ProxyPool:
+    """Hands out proxies round-robin; next() returns None when the pool is empty"""
+
+    def __init__(self, proxies=()):
+        self.proxies = list(proxies)
+        self._cycle = itertools.cycle(self.proxies) if self.proxies else None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.proxies)
+
+    def next(self):
+        if self._cycle is None:
+            return None
+        with self._lock:
+            return next(self._cycle)
+
+
+def cache_key(endpoint, parameters):
+    items = sorted((str(k), str(v)) for k, v in (parameters or {}).items())
+    return (endpoint.lower(), tuple(items))
+
+
+class TTLCache:
+    """Response cache with per-key single-flight, so concurrent identical calls share one fetch"""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def get_or_fetch(self, key, fetch, cacheable=lambda value: True):
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                return value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                value = self._lookup(key)
+            if value is not None:
+                return value
+            value = fetch()
+            if self.ttl > 0 and cacheable(value):
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ProxiedSession:
+    """
+    The shared session as nba_api sees it: requests sent through a proxy skip
+    TLS verification when verify_proxied is False. Everything else, including
+    direct sends and the session's own settings, is left as it is.
+    """
+
+    def __init__(self, session, verify_proxied=True):
+        self.session = session
+        self.verify_proxied = verify_proxied
+
+    def get(self, *args, proxies=None, **kwargs):
+        if not self.verify_proxied and proxies and any(proxies.values()):
+            kwargs['verify'] = False
+        return self.session.get(*args, proxies=proxies, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+def _is_valid(response):
+    return getattr(response, '_status_code', 200) == 200 and response.valid_json()
+
+
+_original_send = None
+proxy_pool = ProxyPool()
+cache = TTLCache()
+
+
+def _send_api_request(self, endpoint, parameters, referer=None, proxy=None, headers=None, timeout=None,
+                      **kwargs):
+    def fetch():
+        return _original_send(self, endpoint, parameters, referer=referer, proxy=proxy or proxy_pool.next(),
+                              headers=headers, timeout=timeout, **kwargs)
+
+    return cache.get_or_fetch(cache_key(endpoint, parameters), fetch, cacheable=_is_valid)
+
+
+def install(session, proxies=None, ttl=DEFAULT_TTL, verify=True):
+    """
+    Route all nba_api stats endpoints through session, the proxy pool and the cache.
+
+    Safe to call more than once (every script calls it at import); later calls
+    replace the proxy pool, and the cache only if the TTL changes.
+    verify=False only turns TLS verification off for requests sent through a
+    proxy; the shared session itself is never changed.
+    With several proxies the stats.nba.com rate limit is scaled by the number of
+    exits, since each one is throttled separately on the server side.
+    """
+    global _original_send, proxy_pool, cache
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    if proxies is None:
+        proxies = proxies_from_env()
+    proxy_pool = ProxyPool(proxies)
+    if cache.ttl != ttl:
+        cache = TTLCache(ttl)
+    if len(proxy_pool) > 1:
+        rate, capacity = _STATS_LIMIT
+        rate_limiter.configure('stats.nba.com', rate * len(proxy_pool), capacity * len(proxy_pool))
+
+    NBAStatsHTTP.set_session(ProxiedSession(session, verify_proxied=verify))
+    if _original_send is None:
+        _original_send = NBAStatsHTTP.send_api_request
+        NBAStatsHTTP.send_api_request = _send_api_request
+    logger.info(f"nba_api transport installed ({len(proxy_pool)} proxies, cache ttl {ttl}s)")
@@ -0,0 +1,290 @@
+"""
+Shared HTTP client for stats.nba.com, cdn.nba.com and the other sites we scrape.
+
+Every host gets one requests.Session with its own keep-alive connection pool and
+browser-like header profile, so repeated calls reuse the same TCP+TLS connection
+instead of paying a fresh handshake each time. Every request also takes a token
+from the host's rate limiter before it goes out, and transient failures are
+retried (honouring Retry-After) behind a per-host circuit breaker, see retry.py.
+Setting WOLFWISE_HTTP_MODE=record/replay captures or replays all of this traffic
+from local fixtures instead, see fixtures.py.
+
+Usage from a script:
+
+    from common.nba_http import fetch_nba_data, process_data
+
+    data = fetch_nba_data("https://stats.nba.com/stats/leaguedashplayerstats", params)
+    df = process_data(data)
+"""
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import fixtures, nba_api_transport, rate_limiter
+from .resultsets import loads, to_frame
+from .retry import DEFAULT_POLICY, RETRY_METHODS, RETRY_STATUSES, get_breaker
+from .response_cache import get_default_cache
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeout in seconds applied to every request
+DEFAULT_TIMEOUT = (5, 30)
+
+# Keep-alive connections kept open per host
+POOL_MAXSIZE = 16
+
+
+def _accept_encoding():
+    """Only advertise the encodings urllib3 can actually decode here"""
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            pass
+    return ', '.join(encodings)
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
+
+# Header profiles per host (previously copy-pasted into each script)
+HEADER_PROFILES = {
+    'stats.nba.com': {
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Origin": "https://www.nba.com",
+        "Referer": "https://www.nba.com/",
+        "Sec-Ch-Ua": "\"Chromium\";v=\"122\", \"Not(A:Brand\";v=\"24\", \"Google Chrome\";v=\"122\"",
+        "Sec-Ch-Ua-Mobile": "?0",
+        "Sec-Ch-Ua-Platform": "\"macOS\"",
+        "Sec-Fetch-Dest": "empty",
+        "Sec-Fetch-Mode": "cors",
+        "Sec-Fetch-Site": "same-site",
+        "User-Agent": BROWSER_USER_AGENT,
+    },
+    'cdn.nba.com': {
+        "Accept": "*/*",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Origin": "https://www.nba.com",
+        "Referer": "https://www.nba.com/",
+        "Sec-Fetch-Dest": "empty",
+        "Sec-Fetch-Mode": "cors",
+        "Sec-Fetch-Site": "same-site",
+        "User-Agent": BROWSER_USER_AGENT,
+    },
+    'www.nba.com': {
+        "Accept": "*/*",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Origin": "https://www.nba.com",
+        "Referer": "https://www.nba.com/",
+        "User-Agent": BROWSER_USER_AGENT,
+    },
+    'www.basketball-reference.com': {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Accept-Language": "en-US,en;q=0.9",
+        "User-Agent": BROWSER_USER_AGENT,
+    },
+    'www.nbaapi.com': {
+        "Accept": "application/json",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Content-Type": "application/json",
+        "User-Agent": BROWSER_USER_AGENT,
+    },
+}
+
+DEFAULT_PROFILE = {
+    "Accept": "*/*",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "User-Agent": BROWSER_USER_AGENT,
+}
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    Connection pool that waits for the host's rate limiter before each send.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried according to
+    the retry policy, and every attempt is reported to the host's circuit breaker.
+    Once the retries run out the last response is returned (or the last error
+    raised) exactly as a plain adapter would.
+    """
+
+    def __init__(self, *args, retry_policy=DEFAULT_POLICY, **kwargs):
+        self.retry_policy = retry_policy
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).hostname
+        breaker = get_breaker(host)
+        attempt = 0
+        while True:
+            attempt += 1
+            breaker.before_request()
+            rate_limiter.acquire(host)
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                breaker.record_failure()
+                delay = self.retry_policy.delay(attempt) if request.method in RETRY_METHODS else None
+                if delay is None:
+                    raise
+                logger.warning(f"{request.method} {request.url} failed ({e}); retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return response
+
+            breaker.record_failure()
+            delay = self.retry_policy.delay(attempt, response)
+            if delay is None:
+                return response
+            logger.warning(f"{request.method} {request.url} returned {response.status_code}; "
+                           f"retry {attempt} in {delay:.1f}s")
+            response.content  # drain the body so the connection goes back to the pool
+            response.close()
+            time.sleep(delay)
+
+
+class RecordingAdapter(RateLimitedAdapter):
+    """Live adapter that also saves every final response to the fixture store"""
+
+    def __init__(self, store, *args, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.store.save(request, response)
+        return response
+
+
+def _make_adapter():
+    """Adapter for the current WOLFWISE_HTTP_MODE (live, record or replay)"""
+    mode = fixtures.get_mode()
+    if mode == fixtures.REPLAY:
+        return fixtures.ReplayAdapter(fixtures.get_default_store())
+    if mode == fixtures.RECORD:
+        return RecordingAdapter(fixtures.get_default_store(), pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+    return RateLimitedAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(host):
+    """Return the pooled session for a host, creating it on first use"""
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = _make_adapter()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(HEADER_PROFILES.get(host, DEFAULT_PROFILE))
+            _sessions[host] = session
+        return session
+
+
+def install_nba_api_session(proxies=None, cache_ttl=nba_api_transport.DEFAULT_TTL, verify=True):
+    """
+    Route every nba_api endpoint through our pooled, rate-limited stats.nba.com session,
+    rotating over proxies (default: NBA_API_PROXIES / PROXY_URL) and caching responses
+    for cache_ttl seconds. verify=False skips TLS verification on proxied sends only.
+    See nba_api_transport.py.
+    """
+    nba_api_transport.install(get_session('stats.nba.com'), proxies=proxies, ttl=cache_ttl, verify=verify)
+
+
+def close_sessions():
+    """Close every pooled connection (call at the end of long-running processes)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def request(method, url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """Send a request through the host's pooled session; headers override the host profile"""
+    session = get_session(urlsplit(url).hostname)
+    return session.request(method, url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return request('GET', url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+
+def post(url, json=None, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return request('POST', url, json=json, headers=headers, timeout=timeout, **kwargs)
+
+
+def conditional_get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, cache=None):
+    """
+    GET that revalidates against the response cache.
+
+    Sends the stored ETag / Last-Modified back to the server and returns
+    (entry, modified). On a 304 the cached entry is returned with modified=False,
+    so its already-parsed JSON is reused. A 304 with nothing cached is retried
+    once without validators, and raises HTTPError if it comes back 304 again.
+    """
+    cache = cache or get_default_cache()
+    entry = cache.lookup(url, params)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        request_headers.update(entry.validators())
+
+    response = get(url, params=params, headers=request_headers, timeout=timeout)
+    if response.status_code == 304:
+        if entry is not None:
+            return entry, False
+        # Nothing cached to serve (validators came from the caller): ask once more without them
+        unconditional = {k: v for k, v in request_headers.items()
+                         if k.lower() not in ('if-none-match', 'if-modified-since')}
+        response = get(url, params=params, headers=unconditional, timeout=timeout)
+        if response.status_code == 304:
+            raise requests.exceptions.HTTPError(f"304 Not Modified for {url} with no cached response",
+                                                response=response)
+
+    response.raise_for_status()
+    return cache.store(url, params, response), True
+
+
+def fetch_nba_data(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, revalidate=False):
+    """
+    Fetch and decode a JSON payload. A request that still fails after the retries
+    raises requests' exception, and a body that is not JSON raises ValueError.
+
+    With revalidate=True the request goes through the conditional-GET cache, which
+    is what polling scripts should use for the cdn.nba.com liveData feeds.
+    """
+    if revalidate:
+        entry, _ = conditional_get(url, params=params, headers=headers, timeout=timeout)
+        return entry.json()
+    response = get(url, params=params, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return loads(response.content)
+
+
+def process_data(data, result_set=0, schema=None):
+    """Typed DataFrame for one of the resultSets of a stats.nba.com response (by index or name)"""
+    return to_frame(data, result_set, schema)
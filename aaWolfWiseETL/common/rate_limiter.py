@@ -0,0 +1,92 @@
+"""
+Per-host token-bucket rate limiting shared by every fetcher.
+
+A request only waits when its host's bucket is empty, so scripts no longer need
+fixed time.sleep() calls between requests (or between steps that make no request
+at all). The shared HTTP client takes a token before every request it sends.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# host: (requests per second, burst size)
+HOST_LIMITS = {
+    'stats.nba.com': (1.0, 3),
+    'cdn.nba.com': (10.0, 10),
+    'www.nba.com': (2.0, 2),
+    # basketball-reference blocks clients that go over 20 requests a minute
+    'www.basketball-reference.com': (18 / 60, 1),
+    'www.nbaapi.com': (2.0, 2),
+}
+DEFAULT_LIMIT = (5.0, 5)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens and return how long the caller must wait before using them.
+
+        The balance may go negative, which queues concurrent callers one after
+        another instead of letting them all wake up at the same moment.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until the tokens are available; returns the time spent waiting"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host):
+    """Return the shared bucket for a host, creating it from HOST_LIMITS on first use"""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, capacity = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            bucket = TokenBucket(rate, capacity)
+            _buckets[host] = bucket
+        return bucket
+
+
+def configure(host, rate, capacity):
+    """Override the limit for a host (e.g. when running behind a proxy pool)"""
+    with _buckets_lock:
+        HOST_LIMITS[host] = (rate, capacity)
+        _buckets[host] = TokenBucket(rate, capacity)
+
+
+def acquire(host):
+    """Wait for a request slot on a host"""
+    wait = get_bucket(host).acquire()
+    if wait > 0:
+        logger.debug(f"Rate limited on {host}: waited {wait:.2f}s")
+    return wait
@@ -0,0 +1,146 @@
+"""
+On-disk response cache for conditional GETs (ETag / Last-Modified revalidation).
+
+Each response is stored under a key built from the URL and its query parameters,
+together with the validators the server sent back. The next request for the same
+resource sends them as If-None-Match / If-Modified-Since, and on a 304 the cached
+body is served instead of downloading and parsing the JSON again.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .resultsets import loads
+
+logger = logging.getLogger(__name__)
+
+# Override with WOLFWISE_HTTP_CACHE_DIR to keep the cache somewhere else
+DEFAULT_CACHE_DIR = os.getenv(
+    'WOLFWISE_HTTP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.http_cache')
+)
+
+
+def cache_key(url, params=None):
+    """Stable key for a URL and its query parameters (parameter order does not matter)"""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    raw = url + '?' + '&'.join(f"{k}={v}" for k, v in items)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class CacheEntry:
+    """A cached response body plus the validators needed to revalidate it"""
+
+    def __init__(self, url, etag, last_modified, body, stored_at):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.stored_at = stored_at
+        self._data = None
+
+    def validators(self):
+        """Conditional request headers for this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def json(self):
+        """Decoded JSON body, parsed once and then reused across 304s"""
+        if self._data is None:
+            self._data = loads(self.body)
+        return self._data
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        return (os.path.join(self.cache_dir, f"{key}.meta.json"),
+                os.path.join(self.cache_dir, f"{key}.body"))
+
+    def lookup(self, url, params=None):
+        """Return the cached entry for a request, loading it from disk if needed"""
+        key = cache_key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        entry = CacheEntry(meta['url'], meta.get('etag'), meta.get('last_modified'), body, meta['stored_at'])
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def store(self, url, params, response):
+        """Save a 200 response and its validators, replacing any previous entry"""
+        key = cache_key(url, params)
+        entry = CacheEntry(
+            url,
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            response.content,
+            time.time()
+        )
+        with self._lock:
+            self._entries[key] = entry
+
+        meta_path, body_path = self._paths(key)
+        meta = {
+            'url': url,
+            'params': params,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'stored_at': entry.stored_at,
+        }
+        try:
+            # Write to temp files first so a crash never leaves a half-written entry
+            with open(body_path + '.tmp', 'wb') as f:
+                f.write(entry.body)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(meta, f)
+            os.replace(body_path + '.tmp', body_path)
+            os.replace(meta_path + '.tmp', meta_path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+        return entry
+
+    def clear(self):
+        """Drop every cached response from memory and disk"""
+        with self._lock:
+            self._entries.clear()
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.meta.json') or name.endswith('.body'):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide cache shared by every fetcher"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -0,0 +1,140 @@
+"""
+Fast decoding of stats.nba.com resultSets into typed DataFrames.
+
+pd.DataFrame(rowSet, columns=headers) leaves every column as object dtype, which
+is slow to build and several times larger in memory than it needs to be for the
+season-wide dumps (leaguedashplayerstats, leaguedashptstats, ...). Here each
+column is built directly as a numpy array of the right type: ids as int64,
+percentages and ratings as float64, team abbreviations as categoricals, and the
+remaining columns inferred from their values. Per-endpoint schemas in SCHEMAS
+pin the types that inference can't get right on its own.
+
+JSON is decoded with orjson when it is installed, falling back to the stdlib.
+
+    from common.resultsets import loads, to_frame
+
+    data = loads(response.content)
+    df = to_frame(data, 'LeagueDashPlayerStats')
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(body):
+    """Decode a JSON body (bytes or str)"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+INT = 'int64'
+FLOAT = 'float64'
+CATEGORY = 'category'
+STRING = 'object'
+
+# Applied to any endpoint by column-name suffix (checked in order)
+SUFFIX_TYPES = (
+    ('_PCT', FLOAT),
+    ('_RATING', FLOAT),
+    ('_ABBREVIATION', CATEGORY),
+)
+
+# Endpoint ("resource" in the response) -> column -> dtype. Only columns whose
+# type can't be inferred or that we want as categoricals need to be listed.
+_PLAYER_IDS = {'PLAYER_ID': INT, 'TEAM_ID': INT, 'TEAM_ABBREVIATION': CATEGORY}
+SCHEMAS = {
+    'leaguedashplayerstats': dict(_PLAYER_IDS, AGE=FLOAT, MIN=FLOAT, NICKNAME=STRING),
+    'leaguedashteamstats': {'TEAM_ID': INT, 'MIN': FLOAT},
+    'leaguedashptstats': dict(_PLAYER_IDS, MIN=FLOAT),
+    'synergyplaytypes': dict(
+        _PLAYER_IDS, SEASON_ID=STRING, PLAY_TYPE=CATEGORY, TYPE_GROUPING=CATEGORY,
+        PERCENTILE=FLOAT, POSS_PCT=FLOAT, PPP=FLOAT,
+    ),
+    'boxscoremiscv2': {'GAME_ID': STRING, 'TEAM_ID': INT},
+    'leaguegamefinder': {'GAME_ID': STRING, 'SEASON_ID': STRING, 'TEAM_ID': INT,
+                         'TEAM_ABBREVIATION': CATEGORY, 'WL': CATEGORY},
+    'playergamelog': {'GAME_ID': STRING, 'SEASON_ID': STRING, 'Player_ID': INT, 'WL': CATEGORY},
+}
+
+
+def _column_type(name, schema):
+    if name in schema:
+        return schema[name]
+    for suffix, dtype in SUFFIX_TYPES:
+        if name.endswith(suffix):
+            return dtype
+    return None
+
+
+def _build_column(values, dtype):
+    """numpy/pandas array for one column; values is a tuple straight out of rowSet"""
+    if dtype == FLOAT:
+        # numpy turns None into NaN for float arrays
+        return np.array(values, dtype=np.float64)
+    if dtype == INT:
+        try:
+            return np.array(values, dtype=np.int64)
+        except (TypeError, ValueError):
+            return pd.array(values, dtype='Int64')
+    if dtype == CATEGORY:
+        return pd.Categorical(values)
+    if dtype == STRING:
+        return np.array(values, dtype=object)
+
+    # Inferred: let numpy pick int64/float64 for numeric columns, keep the rest as objects
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        try:
+            array = np.array(values)
+            if array.dtype.kind in 'if':
+                return array
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    return np.array(values, dtype=object)
+
+
+def get_result_set(data, result_set=0):
+    """Pick a result set by position or by name; handles both resultSets and resultSet payloads"""
+    sets = data.get('resultSets', data.get('resultSet'))
+    if isinstance(sets, dict):
+        sets = [sets]
+    if isinstance(result_set, str):
+        for candidate in sets:
+            if candidate.get('name') == result_set:
+                return candidate
+        raise KeyError(f"No result set named {result_set!r}; have {[s.get('name') for s in sets]}")
+    return sets[result_set]
+
+
+def to_frame(data, result_set=0, schema=None):
+    """
+    Build a typed DataFrame from one result set of a stats.nba.com response.
+
+    schema maps column names to dtypes ('int64', 'float64', 'category', 'object')
+    and defaults to the entry in SCHEMAS for the response's resource.
+    """
+    result = get_result_set(data, result_set)
+    headers = result['headers']
+    rows = result['rowSet']
+    if schema is None:
+        schema = SCHEMAS.get(str(data.get('resource', '')).lower(), {})
+
+    if not rows:
+        return pd.DataFrame(columns=headers)
+
+    # Keyed by position so endpoints that repeat a header name keep every column
+    columns = {
+        i: _build_column(values, _column_type(name, schema))
+        for i, (name, values) in enumerate(zip(headers, zip(*rows)))
+    }
+    df = pd.DataFrame(columns, copy=False)
+    df.columns = headers
+    return df
@@ -0,0 +1,136 @@
+"""
+Retry policy and per-host circuit breakers used by the shared HTTP client.
+
+Transient failures (connection errors, timeouts, 429 and 5xx responses) are
+retried with capped exponential backoff and full jitter, or after the delay the
+server asked for in Retry-After. Every attempt is also reported to the host's
+circuit breaker: after FAILURE_THRESHOLD failures in a row the breaker opens and
+requests to that host fail immediately with CircuitOpenError until the cooldown
+has passed, at which point a single probe request decides whether it closes again.
+"""
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying; anything else is returned to the caller as is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Only idempotent requests are re-sent after a connection error or timeout
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+FAILURE_THRESHOLD = 5
+COOLDOWN = 60.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0, max_retry_after=120.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Give up instead of sleeping if the server asks us to wait longer than this
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def delay(self, attempt, response=None):
+        """
+        Seconds to wait before the next attempt, or None if we should stop retrying.
+
+        A Retry-After header on the response takes precedence over the backoff.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        return self.backoff(attempt)
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds from now; accepts both delta-seconds and HTTP-date forms"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    def __init__(self, host, failure_threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def before_request(self):
+        """Raise CircuitOpenError if the host is cooling down; otherwise let the request through"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self._probe_in_flight:
+                raise CircuitOpenError(
+                    f"Circuit open for {self.host} after {self._failures} failures; "
+                    f"retry in {max(remaining, 0):.0f}s"
+                )
+            # Cooldown over: let exactly one request through to test the host
+            self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit closed for {self.host}")
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit opened for {self.host} after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host):
+    """Return the shared circuit breaker for a host"""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
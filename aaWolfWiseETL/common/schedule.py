@@ -0,0 +1,268 @@
+"""
+Season schedule index: game IDs by team, date and status.
+
+The live-game scripts used to download the whole league's LeagueGameFinder
+result from stats.nba.com at import time just to pick the Timberwolves' latest
+game ID. This module instead keeps the season schedule from cdn.nba.com in the
+on-disk response cache (revalidated with a conditional GET every few hours),
+refreshes game statuses from the much smaller today's-scoreboard feed, and
+answers lookups from in-memory indexes.
+
+    from common.schedule import latest_game_id
+
+    game_id = latest_game_id('MIN')
+"""
+import logging
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+from .nba_http import conditional_get
+from .response_cache import get_default_cache
+
+logger = logging.getLogger(__name__)
+
+# Current season, served from the CDN
+SCHEDULE_URL = "https://cdn.nba.com/static/json/staticData/scheduleLeagueV2.json"
+# Any season (same payload layout), used for seasons the CDN no longer serves
+SEASON_SCHEDULE_URL = "https://stats.nba.com/stats/scheduleleaguev2"
+SCOREBOARD_URL = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
+
+# How long a loaded schedule / scoreboard is trusted before revalidating it
+SCHEDULE_MAX_AGE = 6 * 60 * 60
+SCOREBOARD_MAX_AGE = 30
+
+STATUS_SCHEDULED = 1
+STATUS_LIVE = 2
+STATUS_FINAL = 3
+
+# The first three digits of a game ID encode the season type
+SEASON_TYPES = {
+    '001': 'Pre Season',
+    '002': 'Regular Season',
+    '003': 'All Star',
+    '004': 'Playoffs',
+    '005': 'PlayIn',
+    '006': 'IST Final',
+}
+
+
+def _parse_utc(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class Game:
+    __slots__ = ('game_id', 'start', 'date', 'status', 'home', 'away', 'home_id', 'away_id')
+
+    def __init__(self, game_id, start, date, status, home, away, home_id=None, away_id=None):
+        self.game_id = game_id
+        self.start = start  # tip-off, timezone-aware UTC
+        self.date = date  # local game date as 'YYYY-MM-DD'
+        self.status = status
+        self.home = home
+        self.away = away
+        self.home_id = home_id
+        self.away_id = away_id
+
+    @classmethod
+    def from_schedule(cls, game, game_date=None):
+        """Build from a scheduleLeagueV2 or todaysScoreboard game object"""
+        start = _parse_utc(game.get('gameDateTimeUTC') or game.get('gameTimeUTC'))
+        date = (game.get('gameDateEst') or game_date or (start.isoformat() if start else ''))[:10]
+        return cls(
+            game['gameId'],
+            start,
+            date,
+            game.get('gameStatus', STATUS_SCHEDULED),
+            game['homeTeam'].get('teamTricode'),
+            game['awayTeam'].get('teamTricode'),
+            game['homeTeam'].get('teamId'),
+            game['awayTeam'].get('teamId'),
+        )
+
+    @property
+    def season_type(self):
+        return SEASON_TYPES.get(self.game_id[:3])
+
+    @property
+    def is_live(self):
+        return self.status == STATUS_LIVE
+
+    @property
+    def is_final(self):
+        return self.status == STATUS_FINAL
+
+    def opponent(self, team):
+        return self.away if team == self.home else self.home
+
+    def __repr__(self):
+        return f"Game({self.game_id}, {self.away} @ {self.home}, {self.date}, status={self.status})"
+
+
+class ScheduleIndex:
+    """In-memory indexes over one season's games"""
+
+    def __init__(self, games=(), season=None):
+        self.season = season
+        self.by_id = {game.game_id: game for game in games}
+        self._reindex()
+
+    def _reindex(self):
+        self.by_team = {}
+        self.by_date = {}
+        for game in sorted(self.by_id.values(), key=lambda g: (g.start, g.game_id)):
+            for team in (game.home, game.away):
+                if team:
+                    self.by_team.setdefault(team, []).append(game)
+            self.by_date.setdefault(game.date, []).append(game)
+        self._team_starts = {team: [g.start for g in games] for team, games in self.by_team.items()}
+
+    @classmethod
+    def from_payload(cls, data):
+        """Build from a scheduleLeagueV2 response"""
+        schedule = data['leagueSchedule']
+        games = [
+            Game.from_schedule(game, game_date.get('gameDate'))
+            for game_date in schedule['gameDates']
+            for game in game_date['games']
+        ]
+        # Placeholder games (e.g. unscheduled playoff slots) have no tip-off time yet
+        games = [g for g in games if g.start is not None]
+        return cls(games, schedule.get('seasonYear'))
+
+    def update(self, games):
+        """
+        Merge fresher game objects (e.g. from today's scoreboard) into the index.
+
+        Status changes are applied in place; the per-team indexes are only rebuilt
+        if a game was added or its tip-off moved.
+        """
+        reindex = False
+        for game in games:
+            known = self.by_id.get(game.game_id)
+            if known is None or known.start != game.start:
+                self.by_id[game.game_id] = game
+                reindex = True
+            else:
+                known.status = game.status
+        if reindex:
+            self._reindex()
+
+    def get(self, game_id):
+        return self.by_id.get(game_id)
+
+    def games_for_team(self, team, season_type=None):
+        games = self.by_team.get(team, [])
+        if season_type is None:
+            return list(games)
+        return [g for g in games if g.season_type == season_type]
+
+    def games_on(self, date):
+        """Games on a local game date ('YYYY-MM-DD' string or date object)"""
+        return list(self.by_date.get(str(date), []))
+
+    def live_games(self):
+        return [g for g in self.by_id.values() if g.is_live]
+
+    def latest_game(self, team, season_type=None, now=None):
+        """
+        The team's game in progress, or else its most recent game that has tipped off.
+
+        Returns None if the team has not played yet (in that season type).
+        """
+        now = now or datetime.now(timezone.utc)
+        games = self.by_team.get(team, [])
+        i = bisect_right(self._team_starts.get(team, []), now)
+        for game in reversed(games[:i]):
+            if season_type is None or game.season_type == season_type:
+                return game
+        return None
+
+    def next_game(self, team, season_type=None, now=None):
+        """The team's first game that has not tipped off yet"""
+        now = now or datetime.now(timezone.utc)
+        games = self.by_team.get(team, [])
+        i = bisect_right(self._team_starts.get(team, []), now)
+        for game in games[i:]:
+            if season_type is None or game.season_type == season_type:
+                return game
+        return None
+
+
+class _LoadedSchedule:
+    def __init__(self, index, url, params=None):
+        self.index = index
+        self.url = url
+        self.params = params
+        self.loaded_at = time.monotonic()
+        self.scoreboard_at = None
+
+
+_schedules = {}
+_schedules_lock = threading.RLock()
+
+
+def _fetch_index(url, params=None, revalidate=True):
+    """Load a schedule payload, from the response cache alone when revalidate is False"""
+    entry = None
+    if not revalidate:
+        entry = get_default_cache().lookup(url, params)
+    if entry is None:
+        entry, modified = conditional_get(url, params=params)
+        logger.info(f"Schedule {'downloaded' if modified else 'unchanged'}: {url}")
+    return ScheduleIndex.from_payload(entry.json())
+
+
+def _refresh_scoreboard(loaded):
+    try:
+        entry, _ = conditional_get(SCOREBOARD_URL)
+        scoreboard = entry.json()['scoreboard']
+    except Exception as e:
+        logger.warning(f"Could not refresh today's scoreboard: {e}")
+        return
+    # Applied even on a 304, since the schedule may have been reloaded since
+    loaded.index.update(Game.from_schedule(g, scoreboard.get('gameDate')) for g in scoreboard['games'])
+    loaded.scoreboard_at = time.monotonic()
+
+
+def load_schedule(season=None, refresh=False):
+    """
+    Return the ScheduleIndex for a season ('2024-25'), or the current one if None.
+
+    The index is kept for the life of the process; the current season's schedule
+    is revalidated after SCHEDULE_MAX_AGE and its statuses after SCOREBOARD_MAX_AGE.
+    Past seasons no longer change, so once cached on disk they are never re-fetched.
+    """
+    with _schedules_lock:
+        loaded = _schedules.get(season or 'current')
+        if loaded is None and season is not None:
+            if load_schedule().season == season:
+                loaded = _schedules['current']
+            else:
+                params = {'LeagueID': '00', 'Season': season}
+                index = _fetch_index(SEASON_SCHEDULE_URL, params, revalidate=False)
+                loaded = _LoadedSchedule(index, SEASON_SCHEDULE_URL, params)
+            _schedules[season] = loaded
+        elif loaded is None:
+            loaded = _schedules['current'] = _LoadedSchedule(_fetch_index(SCHEDULE_URL), SCHEDULE_URL)
+
+        if loaded.url != SCHEDULE_URL:
+            return loaded.index
+
+        now = time.monotonic()
+        if refresh or now - loaded.loaded_at > SCHEDULE_MAX_AGE:
+            loaded.index = _fetch_index(SCHEDULE_URL)
+            loaded.loaded_at = now
+            loaded.scoreboard_at = None
+        if refresh or loaded.scoreboard_at is None or now - loaded.scoreboard_at > SCOREBOARD_MAX_AGE:
+            _refresh_scoreboard(loaded)
+        return loaded.index
+
+
+def latest_game_id(team='MIN', season=None, season_type=None):
+    """Game ID of the team's current or most recent game"""
+    game = load_schedule(season).latest_game(team, season_type=season_type)
+    return game.game_id if game is not None else None
@@ -3,14 +3,13 @@ import pandas as pd
 from supabase import create_client
 import os
 from typing import List, Dict
-import time
-import random
-from requests.exceptions import RequestException
-from http.client import RemoteDisconnected
 import logging
 from dotenv import load_dotenv
-from nba_api.stats.library.http import NBAStatsHTTP
 import requests
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.nba_http import install_nba_api_session
 
 # Load environment variables from .env file
 load_dotenv()
@@ -23,38 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Custom NBAStatsHTTP class with proxy and SSL bypass
-class ProxyNBAStatsHTTP(NBAStatsHTTP):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        proxy_url = os.getenv('PROXY_URL')
-        if proxy_url:
-            self.proxies = {
-                'http': proxy_url,
-                'https': proxy_url,
-            }
-            logger.info(f"Proxy configured: {proxy_url}")
-        else:
-            self.proxies = {}
-            logger.warning("No PROXY_URL found in environment variables; running without proxy.")
-
-    def send_api_request(self, *args, **kwargs):
-        # Bypass SSL verification for all requests
-        return super().send_api_request(*args, proxies=self.proxies, verify=False, **kwargs)
-
-# Replace the default HTTP client with our proxy-enabled version
-leaguedashplayerstats.LeagueDashPlayerStats.nba_stats_http_class = ProxyNBAStatsHTTP
-
-# Modify the NBA API headers globally
-ProxyNBAStatsHTTP.headers.update({
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                  "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Referer": "https://www.nba.com/",
-    "Origin": "https://www.nba.com/",
-    "Host": "stats.nba.com",
-    "Connection": "keep-alive"
-})
+# Every nba_api endpoint goes through the shared stats.nba.com session, rotating over
+# the proxies in PROXY_URL / NBA_API_PROXIES with SSL verification off for the proxy
+install_nba_api_session(verify=False)
 
 def check_ip_with_proxy():
     """Fetch and log the IP address using the proxy, bypassing SSL verification"""
@@ -67,56 +37,32 @@ def check_ip_with_proxy():
     except Exception as e:
         logger.error(f"Failed to check IP: {str(e)}")
 
-def api_call_with_retry(api_func, max_retries=3):
-    """Make API call with retry logic"""
-    for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                delay = random.uniform(2, 5)
-                logger.info(f"Retry attempt {attempt + 1}, waiting {delay:.1f} seconds...")
-                time.sleep(delay)
-
-            return api_func()
-            
-        except (RequestException, RemoteDisconnected) as e:
-            if attempt == max_retries - 1:
-                logger.error(f"Final attempt failed: {str(e)}")
-                raise
-            logger.warning(f"API call failed: {str(e)}, retrying...")
-            continue
-
 def get_player_stats() -> pd.DataFrame:
     """Fetch player stats from NBA API"""
     logger.info("Initiating NBA stats retrieval...")
 
     logger.info("Fetching per game stats from NBA API...")
-    basic_stats_per_game = api_call_with_retry(
-        lambda: leaguedashplayerstats.LeagueDashPlayerStats(
-            per_mode_detailed='PerGame',
-            measure_type_detailed_defense='Base',
-            season='2024-25'
-        ).get_data_frames()[0]
-    )
+    basic_stats_per_game = leaguedashplayerstats.LeagueDashPlayerStats(
+        per_mode_detailed='PerGame',
+        measure_type_detailed_defense='Base',
+        season='2024-25'
+    ).get_data_frames()[0]
 
     logger.info("Fetching total minutes from NBA API...")
-    basic_stats_totals = api_call_with_retry(
-        lambda: leaguedashplayerstats.LeagueDashPlayerStats(
-            per_mode_detailed='Totals',
-            measure_type_detailed_defense='Base',
-            season='2024-25'
-        ).get_data_frames()[0]
-    )
+    basic_stats_totals = leaguedashplayerstats.LeagueDashPlayerStats(
+        per_mode_detailed='Totals',
+        measure_type_detailed_defense='Base',
+        season='2024-25'
+    ).get_data_frames()[0]
 
     basic_stats_totals['MIN'] = basic_stats_totals['MIN'].round().astype(int)
 
     logger.info("Fetching advanced stats from NBA API...")
-    advanced_stats = api_call_with_retry(
-        lambda: leaguedashplayerstats.LeagueDashPlayerStats(
-            per_mode_detailed='PerGame',
-            measure_type_detailed_defense='Advanced',
-            season='2024-25'
-        ).get_data_frames()[0]
-    )
+    advanced_stats = leaguedashplayerstats.LeagueDashPlayerStats(
+        per_mode_detailed='PerGame',
+        measure_type_detailed_defense='Advanced',
+        season='2024-25'
+    ).get_data_frames()[0]
 
     logger.info(f"Successfully retrieved data for {len(basic_stats_per_game)} players")
 
@@ -152,11 +98,6 @@ def get_player_stats() -> pd.DataFrame:
         stat_records['stat'] = new_name
         transformed_data.extend(stat_records.to_dict('records'))
 
-        if idx < total_stats:
-            delay = random.uniform(0.5, 1)
-            logger.info(f"Waiting {delay:.1f} seconds before processing next stat...")
-            time.sleep(delay)
-
     logger.info(f"Processing stat {total_stats}/{total_stats}: EFG %")
     efg_data = advanced_stats[['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'EFG_PCT']].merge(
         basic_stats_totals[['PLAYER_ID', 'MIN']],
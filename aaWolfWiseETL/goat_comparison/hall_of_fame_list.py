@@ -1,18 +1,15 @@
-import requests
+import os
+import sys
 from bs4 import BeautifulSoup
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
+
 def fetch_nba_hall_of_fame_players():
     url = "https://www.basketball-reference.com/awards/hof.html"
     
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:110.0) "
-            "Gecko/20100101 Firefox/110.0"
-        )
-    }
-    
-    response = requests.get(url, headers=headers)
+    response = nba_http.get(url)
     if response.status_code != 200:
         print(f"Request failed with status code {response.status_code}")
         return []
@@ -1,14 +1,19 @@
 from nba_api.stats.endpoints import playercareerstats
 from nba_api.stats.static import players
 import pandas as pd
-import time
 import os
-import requests
+import sys
 from hall_of_fame_list import fetch_nba_hall_of_fame_players
 import signal
 from contextlib import contextmanager
 import threading
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
+
+# Throttled, retried and cached by the shared stats.nba.com session
+nba_http.install_nba_api_session()
+
 @contextmanager
 def timeout(seconds):
     """Context manager for timing out operations"""
@@ -94,10 +99,9 @@ def get_advanced_stats(player_name):
     """ % player_name
 
     try:
-        response = requests.post(
+        response = nba_http.post(
             url,
-            json={'query': query, 'variables': {}},
-            headers={'Content-Type': 'application/json'}
+            json={'query': query, 'variables': {}}
         )
         response.raise_for_status()
         data = response.json()
@@ -254,9 +258,7 @@ def get_hof_year_by_year_stats():
             else:
                 failed_players.append(f"{player_name} - No player ID found")
                 print(f"Could not find player ID for {player_name}")
-            
-            print(f"Sleeping for rate limit after {player_name}")
-            time.sleep(1)
+
             print(f"Finished processing {player_name}")
             
         except Exception as e:
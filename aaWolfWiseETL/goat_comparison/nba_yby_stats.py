@@ -1,9 +1,7 @@
 from nba_api.stats.endpoints import playercareerstats, commonallplayers
 from nba_api.stats.static import teams
 import pandas as pd
-import time
 import os
-import requests
 from wolves_year_by_year_stats import get_wolves_roster, get_advanced_stats, get_player_career_stats
 
 def get_all_active_players():
@@ -71,9 +69,6 @@ def get_nba_year_by_year_stats():
             all_player_stats.append(stats)
         else:
             failed_players.append(player_name)
-        
-        # Sleep to avoid hitting API rate limits
-        time.sleep(1)
     
     if all_player_stats:
         # Combine all player stats into one DataFrame
@@ -1,9 +1,14 @@
 from nba_api.stats.endpoints import playercareerstats, commonteamroster
 from nba_api.stats.static import teams
 import pandas as pd
-import time
 import os
-import requests
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
+
+# Throttled, retried and cached by the shared stats.nba.com session
+nba_http.install_nba_api_session()
 
 def get_wolves_roster():
     # Get Timberwolves team ID
@@ -58,13 +63,12 @@ def get_advanced_stats(player_name):
     """ % player_name
 
     try:
-        response = requests.post(
+        response = nba_http.post(
             url,
             json={
                 'query': query,
                 'variables': {}
-            },
-            headers={'Content-Type': 'application/json'}
+            }
         )
         response.raise_for_status()
         data = response.json()
@@ -179,9 +183,6 @@ def get_wolves_year_by_year_stats():
         
         if stats is not None:
             all_player_stats.append(stats)
-        
-        # Sleep to avoid hitting API rate limits
-        time.sleep(1)
     
     if all_player_stats:
         # Combine all player stats into one DataFrame
@@ -0,0 +1,32 @@
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from live.checkpoint import Checkpoint
+from live.metrics import LatencyMetrics, serve_metrics
+from live.pipeline import LivePipeline
+from live.producers import ArchiveFinalGame, LineupIntervals, StatLinesCsv
+from live.scheduler import LiveScheduler
+
+# One folder per game with both teams' stat lines and the lineup intervals
+output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'live_games')
+# Prometheus-style latency summaries for every followed game
+metrics_port = 9108
+
+
+def make_pipeline(game):
+    game_dir = os.path.join(output_dir, f"{game.date}_{game.away}_at_{game.home}_{game.game_id}")
+    metrics = LatencyMetrics(game.game_id, jsonl_path=os.path.join(game_dir, 'latency.jsonl'))
+    pipeline = LivePipeline(game.game_id, team=None, metrics=metrics, checkpoint=Checkpoint(game.game_id))
+    pipeline.register(StatLinesCsv(os.path.join(game_dir, 'stat_lines.csv')))
+    pipeline.register(LineupIntervals(game_dir))
+    pipeline.register(ArchiveFinalGame())
+    return pipeline
+
+
+# Main execution: follow every game in progress league-wide, picking up games as they tip off
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve_metrics(metrics_port)
+    LiveScheduler(make_pipeline).run(until_idle=False)
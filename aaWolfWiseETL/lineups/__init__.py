@@ -0,0 +1 @@
+"""Lineup stints, keys and aggregates computed locally from play-by-play."""
@@ -0,0 +1,112 @@
+"""
+Inverted index from players to the stints they were on the floor for.
+
+Every player maps to a bitset over the rows of a season stint table (one bit
+per stint, packed eight to a byte), kept separately for the stints the player
+played as the home and as the away side. "A, B and C on together, D off" is
+then the AND of three bitsets with the complement of a fourth, and the totals
+are sums over the surviving rows, so a query over a full league season takes
+milliseconds instead of a pass over every lineup.
+
+    table, slots = build_league_stints(season_game_ids('2024-25'))
+    index = StintIndex(table, slots)
+    index.query(on=[1630162, 1626157], off=[203497])
+"""
+import numpy as np
+import pandas as pd
+
+from .keys import contains
+from .possessions import ratings
+
+
+class StintIndex:
+    """Player -> stint bitsets over a season_stint_table()"""
+
+    def __init__(self, table, slots):
+        self.table = table.reset_index(drop=True)
+        self.slots = slots
+        self.n = len(self.table)
+        # personId -> {'home': packed bits, 'away': packed bits}
+        self._bits = {}
+        self._games = pd.factorize(self.table['game_id'])[0]
+        self._seconds = self.table['seconds'].to_numpy(dtype=np.float64)
+        self._home_points = self.table['home_points'].to_numpy(dtype=np.int64)
+        self._away_points = self.table['away_points'].to_numpy(dtype=np.int64)
+        self._home_possessions = self.table['home_possessions'].to_numpy(dtype=np.int64)
+        self._away_possessions = self.table['away_possessions'].to_numpy(dtype=np.int64)
+
+        for side in ('home', 'away'):
+            team_ids = self.table[f'{side}_team_id'].to_numpy()
+            lineups = self.table[f'{side}_lineup'].to_numpy()
+            for team_id in np.unique(team_ids):
+                rows = team_ids == team_id
+                for person_id in slots.team_players(team_id):
+                    on = rows & contains(lineups, slots.bit(team_id, person_id))
+                    if not on.any():
+                        continue
+                    bits = self._bits.setdefault(person_id, {})
+                    packed = np.packbits(on)
+                    bits[side] = bits[side] | packed if side in bits else packed
+
+    def __contains__(self, person_id):
+        return int(person_id) in self._bits
+
+    def _empty(self):
+        return np.zeros((self.n + 7) // 8, dtype=np.uint8)
+
+    def player_bits(self, person_id, side=None):
+        """Packed bitset of the stints the player was on for (as the home or away side, or either)"""
+        bits = self._bits.get(int(person_id), {})
+        if side is not None:
+            return bits.get(side, self._empty())
+        return bits.get('home', self._empty()) | bits.get('away', self._empty())
+
+    def rows(self, on, off=()):
+        """
+        Row numbers of the stints where every player in on was on the floor and
+        none in off, with the side ('home'/'away' per row) of the first on player.
+        """
+        on = [int(p) for p in on]
+        if not on:
+            raise ValueError("At least one player must be on the floor")
+        selected = self.player_bits(on[0])
+        for person_id in on[1:]:
+            selected = selected & self.player_bits(person_id)
+        for person_id in off:
+            selected = selected & ~self.player_bits(person_id)
+        rows = np.flatnonzero(np.unpackbits(selected, count=self.n))
+        anchor_home = np.unpackbits(self.player_bits(on[0], 'home'), count=self.n)[rows].astype(bool)
+        return rows, np.where(anchor_home, 'home', 'away')
+
+    def stints(self, on, off=()):
+        """The matching rows of the stint table"""
+        rows, _ = self.rows(on, off)
+        return self.table.iloc[rows]
+
+    def query(self, on, off=()):
+        """
+        Totals over the stints where every player in on was on the floor and none
+        in off: stints, games, minutes, points and possessions for and against,
+        plus-minus and ratings per 100 possessions, from the point of view of
+        the first player's team.
+        """
+        rows, sides = self.rows(on, off)
+        home = sides == 'home'
+        points_for = np.where(home, self._home_points[rows], self._away_points[rows]).sum()
+        points_against = np.where(home, self._away_points[rows], self._home_points[rows]).sum()
+        possessions_for = np.where(home, self._home_possessions[rows], self._away_possessions[rows]).sum()
+        possessions_against = np.where(home, self._away_possessions[rows], self._home_possessions[rows]).sum()
+        offensive, defensive, net = ratings(points_for, points_against, possessions_for, possessions_against)
+        return {
+            'stints': int(len(rows)),
+            'games': int(len(np.unique(self._games[rows]))),
+            'minutes': float(self._seconds[rows].sum() / 60),
+            'points_for': int(points_for),
+            'points_against': int(points_against),
+            'plus_minus': int(points_for - points_against),
+            'possessions_for': int(possessions_for),
+            'possessions_against': int(possessions_against),
+            'offensive_rating': float(offensive),
+            'defensive_rating': float(defensive),
+            'net_rating': float(net),
+        }
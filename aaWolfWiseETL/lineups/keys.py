@@ -0,0 +1,128 @@
+"""
+Compact lineup keys.
+
+A lineup is a set of players from one team. Its canonical form is the sorted
+tuple of personIds (lineup_key). Stored, it is a bitmask over the team's
+roster slots for the season (RosterSlots): every player who appears for a team
+gets the next free bit, so any lineup of that team is a single int64. Lineup
+equality and groupby become integer comparisons, "is player X on the floor" is
+a bit test, and a stint table carries two int64 columns instead of two
+comma-joined name strings. RosterSlots.table() is the lookup back to personIds
+and names.
+
+    slots = RosterSlots()
+    key = slots.key(1610612750, [1630162, 203497, 1626157, 1629675, 1630183])
+    slots.person_ids(1610612750, key)     # sorted personIds
+    slots.lineup_names(1610612750, key)
+"""
+import numpy as np
+import pandas as pd
+
+# Bits available in an int64 key
+MAX_SLOTS = 63
+
+
+def lineup_key(person_ids):
+    """Canonical lineup key: the sorted tuple of personIds"""
+    return tuple(sorted(int(p) for p in person_ids))
+
+
+def parse_group_id(group_id):
+    """personIds of a stats.nba.com GROUP_ID ('-1626157-1630162-') as a lineup_key"""
+    return lineup_key(p for p in str(group_id).split('-') if p)
+
+
+def popcount(keys):
+    """Number of players in each key"""
+    keys = np.asarray(keys, dtype=np.int64)
+    bits = np.unpackbits(keys.view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1).astype(np.int8).reshape(keys.shape)
+
+
+def contains(keys, bits):
+    """Which keys include every player of bits (a key or the OR of player bits)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    return (keys & np.int64(bits)) == np.int64(bits)
+
+
+class RosterSlots:
+    """Per-team roster slot assignment for a season and its lookup table"""
+
+    def __init__(self):
+        # team_id -> {personId: slot}
+        self._slots = {}
+        # team_id -> [personId by slot]
+        self._players = {}
+        self.names = {}
+
+    def __len__(self):
+        return sum(len(players) for players in self._players.values())
+
+    def slot(self, team_id, person_id):
+        """The player's slot on the team, assigned on first use"""
+        team_id, person_id = int(team_id), int(person_id)
+        slots = self._slots.setdefault(team_id, {})
+        slot = slots.get(person_id)
+        if slot is None:
+            players = self._players.setdefault(team_id, [])
+            if len(players) == MAX_SLOTS:
+                raise ValueError(f"Team {team_id} has more than {MAX_SLOTS} players")
+            slot = slots[person_id] = len(players)
+            players.append(person_id)
+        return slot
+
+    def team_players(self, team_id):
+        """personIds of the team by slot"""
+        return list(self._players.get(int(team_id), []))
+
+    def bit(self, team_id, person_id):
+        return 1 << self.slot(team_id, person_id)
+
+    def key(self, team_id, person_ids):
+        """int64 key of a lineup given as personIds"""
+        key = 0
+        for person_id in person_ids:
+            key |= self.bit(team_id, person_id)
+        return key
+
+    def person_ids(self, team_id, key):
+        """The lineup_key (sorted personIds) of an int64 key"""
+        players = self._players.get(int(team_id), [])
+        key = int(key)
+        return lineup_key(player for slot, player in enumerate(players) if key >> slot & 1)
+
+    def lineup_names(self, team_id, key):
+        return [self.names.get(person_id, str(person_id)) for person_id in self.person_ids(team_id, key)]
+
+    def add_names(self, names):
+        """Record {personId: name} for lineup_names() and table()"""
+        self.names.update({int(person_id): name for person_id, name in names.items()})
+
+    def remap(self, team_id, roster, masks):
+        """
+        Convert bitmasks over a local roster (personIds by bit, e.g. one game's
+        roster from the stint engine) into the team's season keys, vectorized.
+        """
+        masks = np.asarray(masks, dtype=np.int64)
+        if not len(roster):
+            return np.zeros(len(masks), dtype=np.int64)
+        team_bits = np.array([self.bit(team_id, person_id) for person_id in roster], dtype=np.int64)
+        on = (masks[:, None] >> np.arange(len(roster), dtype=np.int64)) & 1
+        return (on * team_bits).sum(axis=1)
+
+    def table(self):
+        """Lookup table: one row per team and player with the slot, its bit and the name"""
+        rows = [(team_id, slot, 1 << slot, person_id, self.names.get(person_id))
+                for team_id, players in self._players.items() for slot, person_id in enumerate(players)]
+        return pd.DataFrame(rows, columns=['team_id', 'slot', 'bit', 'personId', 'name'])
+
+    @classmethod
+    def from_table(cls, table):
+        """Rebuild from table(), keeping every player's slot"""
+        slots = cls()
+        for row in table.sort_values(['team_id', 'slot']).itertuples(index=False):
+            if slots.slot(row.team_id, row.personId) != row.slot:
+                raise ValueError(f"Slot table for team {row.team_id} has gaps")
+            if isinstance(row.name, str):
+                slots.names[int(row.personId)] = row.name
+        return slots
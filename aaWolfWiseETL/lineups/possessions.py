@@ -0,0 +1,90 @@
+"""
+Possessions from normalized play-by-play.
+
+A possession ends on:
+
+- a made field goal, unless it is an and-one, which ends on the free throw;
+- the last free throw of a trip to the line, if made (is_end_of_free_throw; a
+  miss is settled by the rebound that follows);
+- a defensive rebound;
+- a turnover;
+- the end of a period.
+
+possession_arrays() marks those actions and numbers the possessions in one
+vectorized pass over any number of games. The offense of a possession is
+taken from its last action that says who had the ball: a shot, free throw,
+turnover or offensive rebound by that team, or a defensive rebound by the
+other one. The stint engine counts the possessions ending while each stint was
+on the floor, which puts lineups of any length on a per-100 footing (ratings()).
+
+    df = tag_possessions(normalize_actions(actions))
+"""
+import numpy as np
+import pandas as pd
+
+from live.pbp import free_throw_flags
+
+FIELD_GOALS = ('2pt', '3pt')
+HOME_LOCATION = 'h'
+AWAY_LOCATION = 'v'
+
+
+def possession_arrays(df, location=None, game_column=None):
+    """
+    (possession_end, possession_id, offense) arrays for a normalized frame:
+    whether each action ends a possession, the possession it belongs to
+    (numbered across the whole frame) and that possession's offense ('h', 'v'
+    or None when nothing in it says). location defaults to the 'location'
+    column; game_column closes the last possession of every game.
+    """
+    n = len(df)
+    action_type = df['actionType'].to_numpy()
+    sub_type = pd.Series(df['subType'].to_numpy() if 'subType' in df else np.full(n, None), dtype=object)
+    location = np.asarray(df['location'].to_numpy() if location is None else location, dtype=object)
+    made = (df['shotResult'].to_numpy() == 'Made') if 'shotResult' in df else np.zeros(n, dtype=bool)
+
+    is_field_goal = np.isin(action_type, FIELD_GOALS)
+    is_free_throw = action_type == 'freethrow'
+    is_rebound = action_type == 'rebound'
+    defensive_rebound = is_rebound & (sub_type == 'defensive').to_numpy()
+    offensive_rebound = is_rebound & (sub_type == 'offensive').to_numpy()
+    turnover = action_type == 'turnover'
+    period_end = (action_type == 'period') & (sub_type == 'end').to_numpy()
+
+    # Last free throw of a trip; technical and other uncounted free throws keep the ball where it was
+    _, free_throw_ends = free_throw_flags(action_type, sub_type)
+    trip_end = free_throw_ends & sub_type.str.match(r'\d+ of \d+', na=False).to_numpy()
+
+    # And-one: a made basket followed by a '1 of 1' for the same team at the same clock
+    game = df[game_column].to_numpy() if game_column else np.zeros(n, dtype=np.int8)
+    key = pd.MultiIndex.from_arrays([game, df['period'].to_numpy(), df['clockSeconds'].to_numpy(), location])
+    one_shot = is_free_throw & (sub_type == '1 of 1').to_numpy()
+    and_one = is_field_goal & made & key.isin(key[one_shot])
+
+    ends = (is_field_goal & made & ~and_one) | (trip_end & made) | defensive_rebound | turnover | period_end
+    if game_column and n:
+        ends[np.append(game[1:] != game[:-1], True)] = True
+    possession_id = np.cumsum(ends) - ends
+
+    # Who had the ball, where an action says so
+    flipped = np.where(location == HOME_LOCATION, AWAY_LOCATION,
+                       np.where(location == AWAY_LOCATION, HOME_LOCATION, None))
+    hint = np.where(is_field_goal | is_free_throw | turnover | offensive_rebound, location,
+                    np.where(defensive_rebound, flipped, None))
+    offense = pd.Series(hint, dtype=object).groupby(possession_id).transform('last').to_numpy()
+    return ends, possession_id, offense
+
+
+def tag_possessions(df, game_column=None):
+    """The frame with possessionId, possessionEnd and offense ('h'/'v') columns added"""
+    ends, possession_id, offense = possession_arrays(df, game_column=game_column)
+    return df.assign(possessionId=possession_id, possessionEnd=ends, offense=offense)
+
+
+def ratings(points_for, points_against, possessions_for, possessions_against):
+    """(offensive, defensive, net) points per 100 possessions; NaN where there were no possessions"""
+    points = np.array([points_for, points_against], dtype=np.float64)
+    possessions = np.array([possessions_for, possessions_against], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offensive, defensive = np.where(possessions > 0, 100 * points / possessions, np.nan)
+    return offensive, defensive, offensive - defensive
@@ -0,0 +1,156 @@
+"""
+Season-wide lineup totals computed locally from archived play-by-play.
+
+Instead of one throttled LeagueDashLineups call per team and lineup size, the
+stint engine runs over every completed game of the season, a chunk of games
+per worker process, and the stints are rolled up into 2-, 3- and 5-man
+combination totals for all 30 teams at once:
+
+    table, slots = build_league_stints(season_game_ids('2024-25'))
+    totals = combination_totals(table, slots)
+
+Play-by-play comes from the game archive; games not archived yet are fetched
+once, up front, and every later run makes no network calls at all.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from common.game_archive import GameArchive, get_default_archive
+from common.schedule import load_schedule
+from .keys import popcount
+from .possessions import ratings
+from .stints import build_season_stints, season_stint_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (2, 3, 5)
+
+TOTAL_COLUMNS = ['LINEUP_SIZE', 'TEAM_ID', 'GROUP_ID', 'GROUP_NAME', 'GP', 'MIN', 'PTS_FOR', 'PTS_AGAINST',
+                 'PLUS_MINUS', 'POSS_FOR', 'POSS_AGAINST', 'OFF_RATING', 'DEF_RATING', 'NET_RATING',
+                 'lineup_key', 'player1', 'player2', 'player3', 'player4', 'player5']
+
+# Games per worker task; large enough that loading and slicing dominate the pickling
+CHUNK_SIZE = 40
+
+
+def season_game_ids(season=None, season_type='Regular Season'):
+    """IDs of the season's completed games, in schedule order"""
+    games = load_schedule(season).by_id.values()
+    return [g.game_id for g in games if g.is_final and (season_type is None or g.season_type == season_type)]
+
+
+def _stints_for_games(archive_dir, game_ids):
+    """Worker: GameStints for a chunk of archived games"""
+    df = GameArchive(archive_dir).load_pbp(game_ids, fetch_missing=False)
+    if df.empty:
+        return []
+    return list(build_season_stints(df).values())
+
+
+def build_league_stints(game_ids, archive=None, processes=None, chunk_size=CHUNK_SIZE, fetch_missing=True):
+    """
+    Season stint table (see season_stint_table) for many games, built in a
+    process pool with one worker per core by default. Returns (table, slots).
+    """
+    archive = archive or get_default_archive()
+    game_ids = [str(g).zfill(10) for g in game_ids]
+    if fetch_missing:
+        archive.fetch_missing(game_ids)
+
+    chunks = [game_ids[i:i + chunk_size] for i in range(0, len(game_ids), chunk_size)]
+    games = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for chunk_games in pool.map(_stints_for_games, [archive.archive_dir] * len(chunks), chunks):
+            games.extend(chunk_games)
+    logger.info(f"Built stints for {len(games)} of {len(game_ids)} games")
+    return season_stint_table(games)
+
+
+def team_stints(table):
+    """
+    Every stint twice, once from each team's side: team_id, lineup, seconds,
+    and points and possessions for and against.
+    """
+    columns = ['game_id', 'stint', 'seconds']
+    sides = []
+    for side, other in (('home', 'away'), ('away', 'home')):
+        sides.append(table[columns].assign(
+            team_id=table[f'{side}_team_id'],
+            lineup=table[f'{side}_lineup'],
+            pts_for=table[f'{side}_points'].astype(np.int32),
+            pts_against=table[f'{other}_points'].astype(np.int32),
+            poss_for=table[f'{side}_possessions'].astype(np.int32),
+            poss_against=table[f'{other}_possessions'].astype(np.int32),
+        ))
+    return pd.concat(sides, ignore_index=True)
+
+
+def slot_positions(keys, size):
+    """(len(keys), size) slot numbers of keys that all hold exactly size players, in slot order"""
+    keys = np.ascontiguousarray(keys, dtype='<i8')
+    bits = np.unpackbits(keys.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    return np.nonzero(bits)[1].reshape(len(keys), size)
+
+
+def combination_keys(keys, size, lineup_size=5):
+    """Keys of every size-player combination within each lineup_size-player key, shape (len(keys), C)"""
+    positions = slot_positions(keys, lineup_size)
+    subsets = np.array(list(combinations(range(lineup_size), size)))
+    return (np.int64(1) << positions[:, subsets]).sum(axis=2)
+
+
+def combination_totals(table, slots, sizes=DEFAULT_SIZES):
+    """
+    Per team and player combination: GP, MIN, PTS_FOR, PTS_AGAINST and
+    PLUS_MINUS over every stint of the table the combination was on the floor
+    for, the possessions at each end and the offensive, defensive and net
+    ratings per 100 possessions, with GROUP_ID/GROUP_NAME and player1-5 as in
+    LeagueDashLineups. Only stints with five known players on a side count.
+    """
+    teams = team_stints(table)
+    teams = teams[popcount(teams['lineup'].to_numpy()) == 5]
+    if teams.empty:
+        return pd.DataFrame(columns=TOTAL_COLUMNS)
+    game = pd.factorize(teams['game_id'])[0]
+
+    frames = []
+    for size in sizes:
+        keys = combination_keys(teams['lineup'].to_numpy(), size)
+        repeat = keys.shape[1]
+        expanded = pd.DataFrame({
+            'TEAM_ID': np.repeat(teams['team_id'].to_numpy(), repeat),
+            'lineup_key': keys.ravel(),
+            'game': np.repeat(game, repeat),
+            'seconds': np.repeat(teams['seconds'].to_numpy(dtype=np.float64), repeat),
+            'PTS_FOR': np.repeat(teams['pts_for'].to_numpy(), repeat),
+            'PTS_AGAINST': np.repeat(teams['pts_against'].to_numpy(), repeat),
+            'POSS_FOR': np.repeat(teams['poss_for'].to_numpy(), repeat),
+            'POSS_AGAINST': np.repeat(teams['poss_against'].to_numpy(), repeat),
+        })
+        totals = expanded.groupby(['TEAM_ID', 'lineup_key'], sort=False).agg(
+            GP=('game', 'nunique'), seconds=('seconds', 'sum'),
+            PTS_FOR=('PTS_FOR', 'sum'), PTS_AGAINST=('PTS_AGAINST', 'sum'),
+            POSS_FOR=('POSS_FOR', 'sum'), POSS_AGAINST=('POSS_AGAINST', 'sum')).reset_index()
+        totals['LINEUP_SIZE'] = size
+        frames.append(totals)
+    totals = pd.concat(frames, ignore_index=True)
+    totals['MIN'] = (totals.pop('seconds') / 60).round(2)
+    totals['PLUS_MINUS'] = totals['PTS_FOR'] - totals['PTS_AGAINST']
+    offensive, defensive, net = ratings(totals['PTS_FOR'], totals['PTS_AGAINST'],
+                                        totals['POSS_FOR'], totals['POSS_AGAINST'])
+    totals['OFF_RATING'] = offensive.round(1)
+    totals['DEF_RATING'] = defensive.round(1)
+    totals['NET_RATING'] = net.round(1)
+
+    ids = [slots.person_ids(team_id, key) for team_id, key in zip(totals['TEAM_ID'], totals['lineup_key'])]
+    names = [[slots.names.get(person_id, str(person_id)) for person_id in lineup] for lineup in ids]
+    totals['GROUP_ID'] = ['-' + '-'.join(map(str, lineup)) + '-' for lineup in ids]
+    totals['GROUP_NAME'] = [' - '.join(lineup) for lineup in names]
+    for i in range(5):
+        totals[f'player{i + 1}'] = [lineup[i] if len(lineup) > i else None for lineup in names]
+    totals = totals.sort_values(['LINEUP_SIZE', 'TEAM_ID', 'MIN'], ascending=[True, True, False], ignore_index=True)
+    return totals[TOTAL_COLUMNS]
@@ -0,0 +1,381 @@
+"""
+Vectorized lineup stint engine over normalized play-by-play.
+
+build_stints() turns one game's actions (as ordered by normalize_actions) into
+a typed stint table without walking the actions one at a time:
+
+- every player gets a slot in its team's roster for the game, and a lineup is
+  a bitmask over those slots;
+- the five on the floor at the start of each period are inferred from the
+  period's actions (a player who acts before being subbed in, or whose first
+  substitution is 'out', started it), or taken from the boxscore starters;
+- substitutions at the same moment are applied as one batch, and subs made
+  during a free-throw sequence are deferred to the last free throw, as in the
+  live PlayByPlayConsumer;
+- each team's lineup after every batch is a forward fill over a (batches x
+  slots) matrix, and stints are the runs where neither mask changes.
+
+Points are credited to the lineup on the floor when they were scored; the
+action that triggers a lineup change still belongs to the outgoing stint.
+
+    game = build_stints(normalize_actions(actions), starters=(home_ids, away_ids))
+    game.stints                 # one row per stint
+    game.intervals()            # the same, with lineups as player names
+
+build_season_stints() does the same for every game in an archived season frame.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from live.game_clock import elapsed_array, period_start_seconds
+from live.pbp import free_throw_flags, normalize_actions
+from live.timeseries import AWAY, HOME
+from .keys import MAX_SLOTS, RosterSlots, lineup_key
+from .possessions import AWAY_LOCATION, HOME_LOCATION, possession_arrays
+
+logger = logging.getLogger(__name__)
+
+STINT_COLUMNS = ['game_id', 'stint', 'period', 'start', 'end', 'seconds', 'home_lineup', 'away_lineup',
+                 'home_points', 'away_points', 'plus_minus', 'home_possessions', 'away_possessions']
+
+# season_stint_table() adds the teams ahead of the lineups
+SEASON_STINT_COLUMNS = [*STINT_COLUMNS[:6], 'home_team_id', 'away_team_id', *STINT_COLUMNS[6:]]
+
+
+def _next_index(flags):
+    """For each position, the first index at or after it where flags is set (len(flags) if none)"""
+    n = len(flags)
+    positions = np.where(flags, np.arange(n), n)
+    return np.minimum.accumulate(positions[::-1])[::-1]
+
+
+def substitution_cuts(is_sub, free_throw_starts, free_throw_ends, period, clock_seconds):
+    """
+    For each action, how many actions precede the lineup change it causes: a
+    substitution takes effect after the last sub of its batch (the subs made at
+    the same period and clock, logged one after another), or after the last
+    free throw if it was made during a free-throw sequence. -1 for subs whose
+    free-throw sequence never ends (never applied) and for other actions.
+    """
+    n = len(is_sub)
+    index = np.arange(n)
+    last_start = np.maximum.accumulate(np.where(free_throw_starts, index, -1))
+    last_end = np.maximum.accumulate(np.where(free_throw_ends, index, -1))
+    last_end_before = np.concatenate(([-1], last_end[:-1]))
+    deferred = is_sub & (last_start > last_end_before)
+
+    # A batch ends where the next action is not a sub made at the same moment
+    same_moment = (period[1:] == period[:-1]) & (clock_seconds[1:] == clock_seconds[:-1])
+    batch_end = np.append(~(is_sub[1:] & same_moment), True)
+    apply_at = np.where(deferred, _next_index(free_throw_ends), _next_index(batch_end))
+    return np.where(is_sub & (apply_at < n), apply_at + 1, -1)
+
+
+# (period, personId) packed into one integer
+_PERIOD_KEY = 10 ** 10
+
+
+def infer_period_starters(period, person_id, is_sub, sub_in):
+    """
+    (starter keys, seen keys) as sorted period * 10**10 + personId arrays: a
+    player who appears in a period before (or without) being subbed in started
+    it. Players who record no action at all in a period cannot be seen this
+    way; build_stints() carries them over from the end of the previous period.
+    """
+    player = person_id > 0
+    key = period * _PERIOD_KEY + person_id
+    seen = np.unique(key[player])
+    sub_keys, first = np.unique(key[player & is_sub], return_index=True)
+    subbed_in_first = sub_keys[sub_in[player & is_sub][first]]
+    return seen[~np.isin(seen, subbed_in_first)], seen
+
+
+class GameStints:
+    """One game's stint table and the roster slots its lineup masks refer to"""
+
+    def __init__(self, game_id, stints, rosters, team_ids, player_names, timeline=None):
+        self.game_id = game_id
+        # Typed stint table, STINT_COLUMNS
+        self.stints = stints
+        # {HOME/AWAY: personIds}, index = roster slot
+        self.rosters = rosters
+        # {HOME/AWAY: teamId}
+        self.team_ids = team_ids
+        self.player_names = player_names
+        # Positions in the normalized frame (build_stints only): 'first_row' of each stint, and
+        # the HOME/AWAY lineup masks on the floor after each action
+        self.timeline = timeline
+
+    def __len__(self):
+        return len(self.stints)
+
+    def lineup_ids(self, mask, side=HOME):
+        """personIds (sorted) of a lineup mask"""
+        roster = self.rosters[side]
+        return lineup_key(roster[slot] for slot in range(len(roster)) if int(mask) >> slot & 1)
+
+    def lineup_names(self, mask, side=HOME):
+        return [self.player_names.get(person_id, str(person_id)) for person_id in self.lineup_ids(mask, side)]
+
+    def intervals(self):
+        """The stints in the layout of the live lineup interval workbook"""
+        stints = self.stints
+        return pd.DataFrame({
+            'Period': stints['period'],
+            'Start Time': stints['start'],
+            'End Time': stints['end'],
+            'Home Lineup': [', '.join(self.lineup_names(m, HOME)) for m in stints['home_lineup']],
+            'Away Lineup': [', '.join(self.lineup_names(m, AWAY)) for m in stints['away_lineup']],
+            'Home Score': stints['home_points'],
+            'Away Score': stints['away_points'],
+            'Plus/Minus': stints['plus_minus'],
+            'Home Possessions': stints['home_possessions'],
+            'Away Possessions': stints['away_possessions'],
+        })
+
+
+def _side_masks(side_cuts, side_slots, side_values, reset_cuts, reset_states, n_slots):
+    """
+    Cut positions and lineup masks of one team after every period reset and
+    substitution batch, in order, plus the row of each period's reset. Reset
+    rows set every slot; sub rows set one.
+    """
+    n_resets = len(reset_cuts)
+    cuts = np.concatenate((reset_cuts, side_cuts))
+    # At the same cut, a reset wins over a sub made after the previous period's last action
+    order = np.lexsort((np.concatenate((np.ones(n_resets), np.zeros(len(side_cuts)))), cuts))
+
+    state = np.full((len(cuts), n_slots), -1, dtype=np.int8)
+    state[:n_resets] = reset_states
+    state[n_resets + np.arange(len(side_cuts)), side_slots] = side_values
+    state = state[order]
+
+    # Forward fill each slot down the rows; the first row is always a reset
+    source = np.where(state >= 0, np.arange(len(state))[:, None], 0)
+    np.maximum.accumulate(source, axis=0, out=source)
+    state = state[source, np.arange(n_slots)]
+    masks = (state.astype(np.int64) << np.arange(n_slots, dtype=np.int64)).sum(axis=1)
+    return cuts[order], masks, np.flatnonzero(order < n_resets)
+
+
+def _sides(df, home_team_id, away_team_id):
+    """HOME/AWAY/None per action, from the team IDs or the 'location' column ('h'/'v')"""
+    if home_team_id is not None and away_team_id is not None:
+        team_id = pd.to_numeric(df['teamId'], errors='coerce').to_numpy()
+        return np.where(team_id == int(home_team_id), HOME, np.where(team_id == int(away_team_id), AWAY, None))
+    if 'location' in df:
+        location = df['location'].to_numpy()
+        return np.where(location == 'h', HOME, np.where(location == 'v', AWAY, None))
+    raise ValueError("Play-by-play has no 'location' column; pass home_team_id and away_team_id")
+
+
+def _action_arrays(df, home_team_id=None, away_team_id=None, game_column=None):
+    """The columns the engine needs, as numpy arrays (computed once for a whole season)"""
+    n = len(df)
+    side = _sides(df, home_team_id, away_team_id)
+    location = np.where(side == HOME, HOME_LOCATION, np.where(side == AWAY, AWAY_LOCATION, None))
+    possession_end, _, offense = possession_arrays(df, location, game_column)
+    sub_type = df['subType'].to_numpy() if 'subType' in df else np.full(n, None)
+    action_type = df['actionType'].to_numpy()
+    period = df['period'].to_numpy(dtype=np.int64)
+    clock_seconds = df['clockSeconds'].to_numpy(dtype=np.float64)
+    is_sub = action_type == 'substitution'
+    free_throw_starts, free_throw_ends = free_throw_flags(action_type, sub_type)
+    return {
+        'period': period,
+        'clock_seconds': clock_seconds,
+        'elapsed': elapsed_array(period, clock_seconds),
+        'person_id': pd.to_numeric(df['personId'], errors='coerce').fillna(0).to_numpy(dtype=np.int64),
+        'team_id': pd.to_numeric(df['teamId'], errors='coerce').fillna(0).to_numpy(dtype=np.int64),
+        'side': side,
+        'is_sub': is_sub,
+        'sub_in': is_sub & (sub_type == 'in'),
+        'free_throw_starts': free_throw_starts,
+        'free_throw_ends': free_throw_ends,
+        'home_score': df['scoreHome'].to_numpy(dtype=np.int64),
+        'away_score': df['scoreAway'].to_numpy(dtype=np.int64),
+        'home_possession_end': possession_end & (offense == HOME_LOCATION),
+        'away_possession_end': possession_end & (offense == AWAY_LOCATION),
+    }
+
+
+def _player_names(df):
+    for column in ('playerNameI', 'playerName'):
+        if column in df:
+            named = df[['personId', column]].dropna().drop_duplicates('personId')
+            return dict(zip(pd.to_numeric(named['personId']).astype('int64'), named[column]))
+    return {}
+
+
+def _game_stints(game_id, a, starters=None):
+    """The stint table, rosters, team IDs and timeline (see GameStints) of one game from its _action_arrays"""
+    n = len(a['period'])
+    period, elapsed, person_id, side = a['period'], a['elapsed'], a['person_id'], a['side']
+    is_sub, sub_in = a['is_sub'], a['sub_in']
+    # A sub logged between two free throws is ordered after the second one but carries the
+    # score from before it; subs take the score of the last other action instead
+    scored = np.maximum.accumulate(np.where(~is_sub, np.arange(n), 0)) if n else np.arange(0)
+    home_score = a['home_score'][scored]
+    away_score = a['away_score'][scored]
+
+    # Each player's team and roster slot; boxscore starters count even if they never record an action
+    rosters = {s: np.unique(person_id[(side == s) & (person_id > 0)]) for s in (HOME, AWAY)}
+    if starters is not None:
+        for s, ids in zip((HOME, AWAY), starters):
+            rosters[s] = np.union1d(rosters[s], np.asarray(ids, dtype=np.int64))
+    team_ids = {}
+    for s in (HOME, AWAY):
+        seen = a['team_id'][(side == s) & (a['team_id'] > 0)]
+        team_ids[s] = int(seen[0]) if len(seen) else None
+    if max(len(r) for r in rosters.values()) > MAX_SLOTS:
+        raise ValueError(f"Game {game_id} has more than {MAX_SLOTS} players on one side")
+
+    # Who starts each period
+    starter_keys, seen_keys = infer_period_starters(period, person_id, is_sub, sub_in)
+    periods, period_first = np.unique(period, return_index=True)
+    if starters is not None and len(periods):
+        opening = np.array([*starters[0], *starters[1]], dtype=np.int64)
+        starter_keys = np.union1d(starter_keys[starter_keys // _PERIOD_KEY != periods[0]],
+                                  periods[0] * _PERIOD_KEY + opening)
+
+    cut = substitution_cuts(is_sub, a['free_throw_starts'], a['free_throw_ends'], period, a['clock_seconds'])
+    applied = is_sub & (cut >= 0)
+    masks = {}
+    for s in (HOME, AWAY):
+        roster = rosters[s]
+        reset_keys = periods[:, None] * _PERIOD_KEY + roster[None, :]
+        reset_states = np.isin(reset_keys, starter_keys).astype(np.int8)
+        rows = applied & np.isin(person_id, roster)
+        args = (cut[rows], np.searchsorted(roster, person_id[rows]), sub_in[rows].astype(np.int8), period_first)
+        side_cuts, side_masks, reset_rows = _side_masks(*args, reset_states, len(roster))
+        # Fill short period-start lineups with players still on the floor from the previous
+        # period who recorded nothing in this one
+        for k in np.flatnonzero(reset_states.sum(axis=1) < 5):
+            if k == 0:
+                continue
+            previous = (int(side_masks[reset_rows[k] - 1]) >> np.arange(len(roster))) & 1
+            carried = np.flatnonzero(previous.astype(bool) & (reset_states[k] == 0) & ~np.isin(reset_keys[k], seen_keys))
+            if len(carried) and reset_states[k].sum() + len(carried) <= 5:
+                reset_states[k, carried] = 1
+                side_cuts, side_masks, reset_rows = _side_masks(*args, reset_states, len(roster))
+        masks[s] = side_cuts, side_masks
+
+    # Joint timeline: a stint starts at every cut where either lineup changes, and at every period start
+    home_cuts, home_masks = masks[HOME]
+    away_cuts, away_masks = masks[AWAY]
+    cuts = np.union1d(home_cuts, away_cuts)
+    cuts = cuts[cuts < n]
+    home_lineup = home_masks[np.searchsorted(home_cuts, cuts, side='right') - 1]
+    away_lineup = away_masks[np.searchsorted(away_cuts, cuts, side='right') - 1]
+    is_period_start = np.isin(cuts, period_first)
+    new = np.ones(len(cuts), dtype=bool)
+    new[1:] = (home_lineup[1:] != home_lineup[:-1]) | (away_lineup[1:] != away_lineup[:-1]) | is_period_start[1:]
+    cuts, home_lineup, away_lineup, is_period_start = cuts[new], home_lineup[new], away_lineup[new], is_period_start[new]
+
+    # Time and score at each cut (a change applies after the action before it)
+    start = np.where(is_period_start, period_start_seconds(period[cuts]), elapsed[np.maximum(cuts - 1, 0)])
+    end = np.append(start[1:], elapsed[-1] if n else 0.0)
+    bounds = np.append(cuts, n)
+    home_points = np.diff(np.concatenate(([0], home_score))[bounds])
+    away_points = np.diff(np.concatenate(([0], away_score))[bounds])
+    # Possessions are credited to the stint on the floor when they end
+    home_possessions = np.diff(np.concatenate(([0], np.cumsum(a['home_possession_end'])))[bounds])
+    away_possessions = np.diff(np.concatenate(([0], np.cumsum(a['away_possession_end'])))[bounds])
+
+    # Lineups after each action: a change it triggers counts, the next period's starters don't
+    after = np.arange(1, n + 1)
+    period_last = np.append(period[1:] != period[:-1], True) if n else np.zeros(0, dtype=bool)
+    after[period_last] -= 1
+    on_floor = np.searchsorted(cuts, after, side='right') - 1
+
+    # Lineup changes recorded at the same instant as the period start leave empty stints behind
+    keep = (end > start) | (home_points != 0) | (away_points != 0)
+    timeline = {'first_row': cuts[keep], HOME: home_lineup[on_floor], AWAY: away_lineup[on_floor]}
+    start, end = start[keep].astype(np.float32), end[keep].astype(np.float32)
+    home_points, away_points = home_points[keep].astype(np.int16), away_points[keep].astype(np.int16)
+    stints = pd.DataFrame({
+        'game_id': game_id,
+        'stint': np.arange(len(start), dtype=np.int32),
+        'period': period[cuts[keep]].astype(np.int8),
+        'start': start,
+        'end': end,
+        'seconds': end - start,
+        'home_lineup': home_lineup[keep],
+        'away_lineup': away_lineup[keep],
+        'home_points': home_points,
+        'away_points': away_points,
+        'plus_minus': home_points - away_points,
+        'home_possessions': home_possessions[keep].astype(np.int16),
+        'away_possessions': away_possessions[keep].astype(np.int16),
+    }, columns=STINT_COLUMNS)
+    return stints, rosters, team_ids, timeline
+
+
+def build_stints(df, game_id=None, home_team_id=None, away_team_id=None, starters=None):
+    """
+    Stints of one game from its normalized play-by-play frame.
+
+    starters is an optional (home personIds, away personIds) pair for the
+    opening tip, e.g. from the boxscore; later periods are always inferred.
+    The home and away sides come from the team IDs if given, otherwise from
+    the actions' 'location'. Returns a GameStints.
+    """
+    if game_id is None and 'gameid' in df and len(df):
+        game_id = df['gameid'].iat[0]
+    stints, rosters, team_ids, timeline = _game_stints(game_id, _action_arrays(df, home_team_id, away_team_id),
+                                                       starters)
+    return GameStints(game_id, stints, rosters, team_ids, _player_names(df), timeline)
+
+
+def build_season_stints(df, game_column='gameid'):
+    """
+    GameStints for every game of a play-by-play frame holding many games (as
+    returned by GameArchive.load_pbp), keyed by game ID. The columns are
+    extracted once for the whole frame and each game is a slice of them.
+    Games whose stints cannot be built are logged and skipped.
+    """
+    df = normalize_actions(df, game_column=game_column)
+    if df.empty:
+        return {}
+    arrays = _action_arrays(df, game_column=game_column)
+    player_names = _player_names(df)
+    game_ids = df[game_column].to_numpy()
+    starts = np.flatnonzero(np.concatenate(([True], game_ids[1:] != game_ids[:-1])))
+    games = {}
+    for lo, hi in zip(starts, np.append(starts[1:], len(df))):
+        game_id = game_ids[lo]
+        try:
+            stints, rosters, team_ids, _ = _game_stints(game_id,
+                                                        {name: values[lo:hi] for name, values in arrays.items()})
+        except ValueError as e:
+            logger.warning(f"Could not build stints for {game_id}: {e}")
+            continue
+        games[game_id] = GameStints(game_id, stints, rosters, team_ids, player_names)
+    return games
+
+
+def season_stint_table(games, slots=None):
+    """
+    One stint table for many GameStints, with home_team_id/away_team_id and the
+    lineups re-keyed from each game's roster masks to the teams' season keys
+    (see lineups.keys). Returns (table, slots); pass slots to keep extending
+    an existing assignment.
+    """
+    slots = slots if slots is not None else RosterSlots()
+    frames = []
+    for game in games.values() if isinstance(games, dict) else games:
+        stints = game.stints.copy()
+        for s in (HOME, AWAY):
+            team_id = game.team_ids[s] or 0
+            stints[f'{s}_lineup'] = slots.remap(team_id, game.rosters[s], stints[f'{s}_lineup'].to_numpy())
+            stints[f'{s}_team_id'] = np.int64(team_id)
+        slots.add_names({p: game.player_names[p] for s in (HOME, AWAY) for p in game.rosters[s]
+                         if p in game.player_names})
+        frames.append(stints[SEASON_STINT_COLUMNS])
+    if not frames:
+        return pd.DataFrame(columns=SEASON_STINT_COLUMNS), slots
+    table = pd.concat(frames, ignore_index=True)
+    table['game_id'] = table['game_id'].astype('category')
+    return table, slots
@@ -0,0 +1 @@
+"""Live-game ingestion: feed polling, incremental state and derived in-game tables."""
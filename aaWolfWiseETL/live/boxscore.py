@@ -0,0 +1,156 @@
+"""
+Boxscore feed for a live game.
+
+Reads the cdn.nba.com liveData boxscore with conditional GETs and keeps the
+player stat lines that changed since the previous poll. PollSchedule adapts the
+polling interval to the state of the game:
+
+- before tip-off it sleeps until close to the scheduled start;
+- while the clock is running it polls every LIVE_INTERVAL seconds;
+- when the clock stops (timeouts, reviews, free throws) or the feed returns 304
+  it backs off gradually up to STOPPED_MAX_INTERVAL;
+- between quarters and at halftime it waits BREAK_INTERVAL / HALFTIME_INTERVAL;
+- once gameStatus is final it delivers the last update and stops.
+"""
+from datetime import datetime, timezone
+
+from common.nba_http import conditional_get
+from .game_clock import parse_clock
+
+BOXSCORE_URL = "https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
+
+STATUS_SCHEDULED = 1
+STATUS_LIVE = 2
+STATUS_FINAL = 3
+
+# Poll intervals in seconds
+LIVE_INTERVAL = 3
+STOPPED_MAX_INTERVAL = 20
+BREAK_INTERVAL = 30
+HALFTIME_INTERVAL = 90
+PREGAME_MAX_INTERVAL = 300
+ERROR_INTERVAL = 15
+
+
+def player_stat_line(player):
+    """The stat line we store for one player of a liveData boxscore"""
+    stats = player['statistics']
+    return {
+        'Player': f"{player['firstName']} {player['familyName']}",
+        'PTS': stats['points'],
+        'REB': stats['reboundsTotal'],
+        'AST': stats['assists'],
+        'STL': stats['steals'],
+        'TOV': stats['turnovers'],
+        'BLK': stats['blocks'],
+        'FGs': f"{stats['fieldGoalsMade']}-{stats['fieldGoalsAttempted']}",
+        'threePt': f"{stats['threePointersMade']}-{stats['threePointersAttempted']}",
+        'plusMinusPoints': stats['plusMinusPoints']
+    }
+
+
+def stat_line_delta(previous, line):
+    """The fields of a stat line that differ from the previous one (all of them for a new player)"""
+    if previous is None:
+        return dict(line)
+    return {field: value for field, value in line.items() if previous.get(field) != value}
+
+
+def team_side(game, team):
+    """'homeTeam' or 'awayTeam' for a tricode, or None if the team isn't playing"""
+    if game['homeTeam']['teamTricode'] == team:
+        return 'homeTeam'
+    if game['awayTeam']['teamTricode'] == team:
+        return 'awayTeam'
+    return None
+
+
+class PollSchedule:
+    """Chooses the wait before the next poll from the latest game state"""
+
+    def __init__(self):
+        self.interval = LIVE_INTERVAL
+        self._last_clock = None
+
+    def next_interval(self, game, modified=True):
+        """Seconds to wait before polling again, or None once the game is final"""
+        status = game.get('gameStatus')
+        if status == STATUS_FINAL:
+            return None
+        if status == STATUS_SCHEDULED:
+            start = game.get('gameTimeUTC')
+            if start:
+                until_tip = (datetime.fromisoformat(start.replace('Z', '+00:00'))
+                             - datetime.now(timezone.utc)).total_seconds()
+                return min(max(until_tip / 2, LIVE_INTERVAL * 5), PREGAME_MAX_INTERVAL)
+            return PREGAME_MAX_INTERVAL
+
+        period = game.get('period', 0)
+        clock = parse_clock(game.get('gameClock'))
+        if clock == 0:
+            # Between periods
+            self.interval = LIVE_INTERVAL
+            self._last_clock = None
+            return HALFTIME_INTERVAL if period == 2 else BREAK_INTERVAL
+
+        if not modified or clock == self._last_clock:
+            # Clock stopped or nothing published yet: back off
+            self.interval = min(self.interval * 1.5, STOPPED_MAX_INTERVAL)
+        else:
+            self.interval = LIVE_INTERVAL
+        self._last_clock = clock
+        return self.interval
+
+
+class BoxscorePoller:
+    """
+    Reads one game's boxscore feed and tracks the team's player stat lines
+    (both teams' when team is None).
+
+    poll() returns the stat lines that changed since the previous poll (every
+    player on the first one). LivePipeline drives the polling loop.
+    """
+
+    def __init__(self, game_id, team='MIN'):
+        self.game_id = game_id
+        self.url = BOXSCORE_URL.format(game_id=game_id)
+        self.team = team
+        self.stat_lines = {}
+        # Player -> only the fields that changed in the last update
+        self.deltas = {}
+        self.game = None
+
+    def fetch(self):
+        """Conditional GET of the feed; returns (cache entry, modified)"""
+        return conditional_get(self.url)
+
+    def poll(self):
+        """Fetch the boxscore once; returns (game, modified, changed stat lines)"""
+        entry, modified = self.fetch()
+        return self.update(entry.json()['game'], modified)
+
+    def update(self, game, modified=True):
+        """Diff a parsed boxscore 'game' against the stat lines seen so far"""
+        self.game = game
+        if not modified and self.stat_lines:
+            self.deltas = {}
+            return game, False, []
+
+        if self.team is None:
+            sides = ('homeTeam', 'awayTeam')
+        else:
+            side = team_side(game, self.team)
+            if side is None:
+                raise ValueError(f"{self.team} not found in game {self.game_id}")
+            sides = (side,)
+
+        changed = []
+        self.deltas = {}
+        for player in (p for side in sides for p in game[side]['players']):
+            line = player_stat_line(player)
+            previous = self.stat_lines.get(line['Player'])
+            if previous != line:
+                self.deltas[line['Player']] = stat_line_delta(previous, line)
+                self.stat_lines[line['Player']] = line
+                changed.append(line)
+        return game, modified, changed
@@ -0,0 +1,64 @@
+"""
+Per-game checkpoints of the live pipeline state.
+
+After every tick that changed something, LivePipeline writes a small JSON file
+with the play-by-play consumer's state (last actionNumber, the number of stints
+returned so far and the current period's open stints), the stat lines seen so
+far and the state of producers that keep their own (e.g. the closed lineup
+stints). A process restarted mid-game loads it and carries on from the next
+action without returning the stints it already wrote a second time.
+
+Checkpoints live in WOLFWISE_CHECKPOINT_DIR (default aaWolfWiseETL/.live_checkpoints),
+one file per game ID.
+"""
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = os.getenv(
+    'WOLFWISE_CHECKPOINT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.live_checkpoints')
+)
+
+# Bumped when the saved layout changes; older checkpoints are ignored
+VERSION = 3
+
+
+class Checkpoint:
+    def __init__(self, game_id, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+        self.game_id = game_id
+        self.path = os.path.join(checkpoint_dir, f"{game_id}.json")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def load(self):
+        """The saved state, or None if there is no usable checkpoint"""
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        if state.get('version') != VERSION or state.get('game_id') != self.game_id:
+            logger.warning(f"Ignoring checkpoint {self.path} from another version or game")
+            return None
+        return state
+
+    def save(self, state):
+        """Write the state atomically, so a crash mid-write keeps the previous checkpoint"""
+        state = dict(state, version=VERSION, game_id=self.game_id)
+        try:
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(self.path + '.tmp', self.path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not write checkpoint for {self.game_id}: {e}")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
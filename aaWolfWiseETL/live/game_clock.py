@@ -0,0 +1,47 @@
+"""
+Helpers for the liveData game clock ('PT05M12.00S') and period boundaries.
+"""
+import re
+
+import numpy as np
+
+_CLOCK_RE = re.compile(r'PT(\d+)M(\d+(?:\.\d+)?)S')
+
+REGULATION_PERIODS = 4
+PERIOD_SECONDS = 12 * 60
+OVERTIME_SECONDS = 5 * 60
+
+
+def parse_clock(clock_str):
+    """Seconds left in the period, e.g. 'PT06M06.00S' -> 366.0 (0 if the clock is blank/invalid)"""
+    match = _CLOCK_RE.match(clock_str or '')
+    if match:
+        return int(match.group(1)) * 60 + float(match.group(2))
+    return 0.0
+
+
+def period_length(period):
+    return PERIOD_SECONDS if period <= REGULATION_PERIODS else OVERTIME_SECONDS
+
+
+def elapsed_seconds(period, clock_str):
+    """Game seconds elapsed at a given period and clock, counting overtime periods as 5 minutes"""
+    if period <= REGULATION_PERIODS:
+        before = (period - 1) * PERIOD_SECONDS
+    else:
+        before = REGULATION_PERIODS * PERIOD_SECONDS + (period - REGULATION_PERIODS - 1) * OVERTIME_SECONDS
+    return before + period_length(period) - parse_clock(clock_str)
+
+
+def period_start_seconds(period):
+    """Game seconds elapsed when each period starts (array in, array out)"""
+    period = np.asarray(period, dtype=np.int64)
+    return np.where(period <= REGULATION_PERIODS, (period - 1) * PERIOD_SECONDS,
+                    REGULATION_PERIODS * PERIOD_SECONDS + (period - REGULATION_PERIODS - 1) * OVERTIME_SECONDS)
+
+
+def elapsed_array(period, clock_seconds):
+    """Vectorized elapsed_seconds() from period numbers and clockSeconds"""
+    period = np.asarray(period, dtype=np.int64)
+    length = np.where(period <= REGULATION_PERIODS, PERIOD_SECONDS, OVERTIME_SECONDS)
+    return period_start_seconds(period) + length - np.asarray(clock_seconds, dtype=np.float64)
@@ -0,0 +1,225 @@
+"""
+Latency instrumentation for the live ingestion path.
+
+Every tick of a LivePipeline is timed in four spans:
+
+- fetch: the conditional GETs of the boxscore and play-by-play (304s included);
+- parse: decoding the JSON bodies;
+- derive: stat line diffs and the play-by-play state machine;
+- write: running the producers (Supabase, SQLite, workbooks, ...).
+
+Two end-to-end staleness measures are taken when the producers have finished
+writing: from the boxscore's Last-Modified header (when the CDN published it),
+and from the timeActual of the newest play-by-play action (when it happened on
+the court).
+
+Samples go to a JSONL file, one line per tick, and a summary with p50/p95/p99
+per measure is appended when the game ends. serve_metrics() exposes the same
+summaries in the Prometheus text format on a local port.
+
+    metrics = LatencyMetrics(game_id, jsonl_path='live_metrics/0022400123.jsonl')
+    pipeline = LivePipeline(game_id, metrics=metrics)
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPANS = ('fetch', 'parse', 'derive', 'write')
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Samples kept per measure; a game with overtime is well under this many ticks
+MAX_SAMPLES = 10000
+
+
+def parse_http_date(value):
+    """Timezone-aware datetime from a Last-Modified header, or None"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_action_time(value):
+    """Timezone-aware datetime from a play-by-play timeActual ('2024-11-02T00:41:12.4Z'), or None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class TickTimer:
+    """Span durations and end-to-end latencies for one tick"""
+
+    def __init__(self):
+        self.spans = dict.fromkeys(SPANS, 0.0)
+        self.not_modified = 0
+        self.requests = 0
+        self.published_at = None
+        self.action_time = None
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] += time.perf_counter() - start
+
+    def fetched(self, modified):
+        self.requests += 1
+        if not modified:
+            self.not_modified += 1
+
+    def observe_actions(self, actions):
+        for action in actions:
+            when = parse_action_time(action.get('timeActual'))
+            if when is not None and (self.action_time is None or when > self.action_time):
+                self.action_time = when
+
+
+class LatencyMetrics:
+    """Per-game latency samples with JSONL output and percentile summaries"""
+
+    def __init__(self, game_id, jsonl_path=None):
+        self.game_id = game_id
+        self.jsonl_path = jsonl_path
+        self.samples = {}
+        self.totals = {}
+        self._lock = threading.Lock()
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+        register(self)
+
+    def start_tick(self):
+        return TickTimer()
+
+    def _add(self, name, value):
+        self.samples.setdefault(name, deque(maxlen=MAX_SAMPLES)).append(value)
+        count, total = self.totals.get(name, (0, 0.0))
+        self.totals[name] = (count + 1, total + value)
+
+    def finish_tick(self, timer, wrote):
+        """
+        Record a tick. End-to-end latencies are only taken when the producers
+        wrote something, since that is when the data reached the sinks.
+        """
+        committed = datetime.now(timezone.utc)
+        record = {'game_id': self.game_id, 'at': committed.isoformat(), 'requests': timer.requests,
+                  'not_modified': timer.not_modified}
+        with self._lock:
+            for name in SPANS:
+                self._add(name, timer.spans[name])
+                record[name] = round(timer.spans[name], 6)
+            self._add('tick', sum(timer.spans.values()))
+            if wrote and timer.published_at is not None:
+                record['since_published'] = (committed - timer.published_at).total_seconds()
+                self._add('since_published', record['since_published'])
+            if wrote and timer.action_time is not None:
+                record['since_action'] = (committed - timer.action_time).total_seconds()
+                self._add('since_action', record['since_action'])
+        self._write(record)
+
+    def summary(self):
+        """{measure: {'count', 'mean', 'p50', 'p95', 'p99'}} over the kept samples"""
+        with self._lock:
+            samples = {name: np.fromiter(values, dtype=np.float64) for name, values in self.samples.items()}
+        summary = {}
+        for name, values in samples.items():
+            if not len(values):
+                continue
+            p50, p95, p99 = np.quantile(values, QUANTILES)
+            summary[name] = {'count': int(len(values)), 'mean': float(values.mean()),
+                             'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+        return summary
+
+    def write_summary(self):
+        """Append the game's summary to the JSONL file and log it"""
+        summary = self.summary()
+        self._write({'game_id': self.game_id, 'summary': summary})
+        for name, stats in summary.items():
+            logger.info(f"{self.game_id} {name}: p50 {stats['p50']:.3f}s p95 {stats['p95']:.3f}s "
+                        f"p99 {stats['p99']:.3f}s ({stats['count']} samples)")
+        return summary
+
+    def _write(self, record):
+        if not self.jsonl_path:
+            return
+        try:
+            with open(self.jsonl_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError as e:
+            logger.warning(f"Could not write live metrics to {self.jsonl_path}: {e}")
+
+    def prometheus_lines(self):
+        lines = []
+        with self._lock:
+            totals = dict(self.totals)
+        for name, stats in self.summary().items():
+            labels = f'game_id="{self.game_id}",measure="{name}"'
+            for q, key in zip(QUANTILES, ('p50', 'p95', 'p99')):
+                lines.append(f'wolfwise_live_latency_seconds{{{labels},quantile="{q}"}} {stats[key]:.6f}')
+            count, total = totals.get(name, (0, 0.0))
+            lines.append(f'wolfwise_live_latency_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'wolfwise_live_latency_seconds_count{{{labels}}} {count}')
+        return lines
+
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def register(metrics):
+    with _registry_lock:
+        _registry.append(metrics)
+
+
+def prometheus_text():
+    """Every registered game's summaries in the Prometheus text exposition format"""
+    with _registry_lock:
+        games = list(_registry)
+    lines = [
+        '# HELP wolfwise_live_latency_seconds Live ingestion span durations and end-to-end staleness',
+        '# TYPE wolfwise_live_latency_seconds summary',
+    ]
+    for metrics in games:
+        lines.extend(metrics.prometheus_lines())
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_metrics(port=9108, host='127.0.0.1'):
+    """Serve /metrics on a background thread; returns the server (call shutdown() to stop it)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='live-metrics', daemon=True).start()
+    logger.info(f"Live metrics on http://{host}:{port}/metrics")
+    return server
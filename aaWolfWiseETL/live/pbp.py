@@ -0,0 +1,301 @@
+"""
+Play-by-play consumer for a live game.
+
+The liveData play-by-play feed always carries every action since tip-off.
+Whenever it has actions past the last actionNumber seen, PlayByPlayConsumer
+rebuilds the game's stints from the whole feed with lineups.stints, so the live
+intervals are exactly the ones build_stints() gives for the same actions:
+substitutions at the same moment are one batch, subs made during a free-throw
+sequence are held back until the last free throw, and the five who start each
+period are inferred from its actions. A rebuild takes a few tens of
+milliseconds even late in the fourth quarter.
+
+Who started the current period can still change as its actions come in, so
+its stints stay open (open_stints()) and each poll returns only the stints of
+periods that ended since the previous one.
+
+    consumer = PlayByPlayConsumer.from_boxscore(boxscore_data['game'])
+    update = consumer.poll()
+    for stint in update.stints + consumer.open_stints():
+        ...
+
+normalize_actions() turns a batch of actions into the chronologically ordered,
+typed DataFrame the in-game tables are written from, entirely in memory;
+archive_actions() optionally keeps a compact Parquet copy of it.
+"""
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+from common.game_archive import write_parquet
+from common.nba_http import conditional_get
+from .game_clock import parse_clock
+from .timeseries import AWAY, HOME
+
+logger = logging.getLogger(__name__)
+
+PBP_URL = "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
+
+_FREE_THROW_RE = re.compile(r'(\d+) of (\d+)')
+
+
+def is_start_of_free_throw(action):
+    """Check if this action is the start of a free throw sequence (e.g., '1 of 2')."""
+    return action['actionType'] == 'freethrow' and bool(action.get('subType')) and '1 of' in action['subType']
+
+
+def is_end_of_free_throw(action):
+    """Check if this action is the end of a free throw sequence (e.g., '2 of 2')."""
+    if action['actionType'] != 'freethrow':
+        return False
+    sub_type = action.get('subType')
+    if sub_type is None:
+        return True  # End if no subType available
+    match = _FREE_THROW_RE.match(sub_type)
+    if match:
+        return int(match.group(1)) == int(match.group(2))
+    return True  # Assume it's the last free throw
+
+
+def free_throw_flags(action_type, sub_type):
+    """Vectorized is_start_of_free_throw / is_end_of_free_throw: (starts, ends) boolean arrays, row by row"""
+    is_free_throw = np.asarray(action_type) == 'freethrow'
+    sub_type = pd.Series(sub_type, dtype=object).fillna('').astype(str)
+    counts = sub_type.str.extract('^' + _FREE_THROW_RE.pattern)
+    starts = is_free_throw & sub_type.str.contains('1 of', regex=False).to_numpy()
+    ends = is_free_throw & (counts[0].isna() | (counts[0] == counts[1])).to_numpy()
+    return starts, ends
+
+
+def normalize_actions(actions, game_column=None):
+    """
+    Actions (a list of dicts or a DataFrame) as a DataFrame ordered by period,
+    then clock (counting down), with substitutions after everything else at the
+    same clock time so a dead-ball sub never splits a play. scoreHome/scoreAway
+    are typed as integers and the clock is added in seconds as clockSeconds.
+
+    A frame holding many games (e.g. from the game archive) is ordered by
+    game_column first; missing scores carry the game's previous score forward.
+    """
+    df = pd.DataFrame(actions)
+    if df.empty:
+        return df
+    for column in ('scoreHome', 'scoreAway'):
+        scores = pd.to_numeric(df[column], errors='coerce')
+        scores = scores.groupby(df[game_column], sort=False).ffill() if game_column else scores.ffill()
+        df[column] = scores.fillna(0).astype('int64')
+    df['clockSeconds'] = df['clock'].map(parse_clock)
+    keys = ['period', 'clockSeconds', '_substitution', 'actionNumber']
+    ascending = [True, False, True, True]
+    if game_column:
+        keys.insert(0, game_column)
+        ascending.insert(0, True)
+    return (
+        df.assign(_substitution=df['actionType'].eq('substitution'))
+        .sort_values(keys, ascending=ascending, kind='stable')
+        .drop(columns='_substitution')
+        .reset_index(drop=True)
+    )
+
+
+def archive_actions(df, path):
+    """Write normalized actions to a Parquet file (needs pyarrow)"""
+    write_parquet(df, path)
+
+
+def boxscore_player_names(game):
+    """{personId: 'First Last'} for both teams of a liveData boxscore 'game' object"""
+    return {player['personId']: f"{player['firstName']} {player['familyName']}"
+            for team in (game['homeTeam'], game['awayTeam']) for player in team.get('players', [])}
+
+
+class PbpUpdate:
+    """What one call to consume() produced"""
+
+    def __init__(self, actions, stints):
+        # New actions, each annotated with the lineups after it and the change in home margin
+        self.actions = actions
+        # Stints closed by those actions
+        self.stints = stints
+
+    def __bool__(self):
+        return bool(self.actions)
+
+
+class PlayByPlayConsumer:
+    """Stints and annotated actions for one game, rebuilt from the full feed whenever it changes"""
+
+    def __init__(self, game_id, home_team_id, away_team_id, player_names, player_teams,
+                 home_starters, away_starters):
+        self.game_id = game_id
+        self.url = PBP_URL.format(game_id=game_id)
+        self.home_team_id = home_team_id
+        self.away_team_id = away_team_id
+        self.player_names = player_names
+        self.player_teams = player_teams
+        self.home_starters = list(home_starters)
+        self.away_starters = list(away_starters)
+
+        self.last_action_number = 0
+        # Stints of ended periods returned so far, and the current period's stints as of the last poll
+        self.emitted = 0
+        self.open_rows = []
+
+    @classmethod
+    def from_boxscore(cls, game):
+        """Build from a liveData boxscore 'game' object (rosters, team IDs and starters)"""
+        home_team = game['homeTeam']
+        away_team = game['awayTeam']
+        player_names = boxscore_player_names(game)
+        player_teams = {}
+        for team in (home_team, away_team):
+            for player in team.get('players', []):
+                player_teams[player['personId']] = team['teamId']
+
+        home_starters = [p['personId'] for p in home_team.get('players', []) if p.get('starter')][:5]
+        away_starters = [p['personId'] for p in away_team.get('players', []) if p.get('starter')][:5]
+        if len(home_starters) != 5 or len(away_starters) != 5:
+            logger.warning(f"Incorrect number of starters detected - Home: {len(home_starters)}, "
+                           f"Away: {len(away_starters)}")
+        return cls(game['gameId'], home_team['teamId'], away_team['teamId'], player_names, player_teams,
+                   home_starters, away_starters)
+
+    # Attributes saved by to_state() besides the rosters
+    _STATE_FIELDS = ('last_action_number', 'emitted', 'open_rows')
+
+    def to_state(self):
+        """JSON-serializable snapshot of the consumer, for checkpoints"""
+        state = {name: getattr(self, name) for name in self._STATE_FIELDS}
+        state.update({
+            'game_id': self.game_id,
+            'home_team_id': self.home_team_id,
+            'away_team_id': self.away_team_id,
+            'home_starters': self.home_starters,
+            'away_starters': self.away_starters,
+            # JSON object keys are strings, so the rosters are kept as rows
+            'players': [[pid, name, self.player_teams.get(pid)] for pid, name in self.player_names.items()],
+        })
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a consumer saved with to_state(); it carries on from the saved actionNumber"""
+        players = state['players']
+        consumer = cls(state['game_id'], state['home_team_id'], state['away_team_id'],
+                       {pid: name for pid, name, _ in players}, {pid: team for pid, _, team in players},
+                       state['home_starters'], state['away_starters'])
+        for name in cls._STATE_FIELDS:
+            setattr(consumer, name, state[name])
+        return consumer
+
+    def lineup_names(self, lineup):
+        return [self.player_names.get(pid, "Unknown Player") for pid in lineup]
+
+    def new_actions(self, actions):
+        """The actions after the last one applied; the feed lists actions in actionNumber order"""
+        i = len(actions)
+        while i > 0 and actions[i - 1]['actionNumber'] > self.last_action_number:
+            i -= 1
+        return actions[i:]
+
+    def _stint_row(self, start_time, end_time, home_ids, away_ids, home_points, away_points):
+        return {
+            'Start Time': start_time,
+            'End Time': end_time,
+            'Home Lineup': ', '.join(self.lineup_names(home_ids)),
+            'Away Lineup': ', '.join(self.lineup_names(away_ids)),
+            'Home IDs': list(home_ids),
+            'Away IDs': list(away_ids),
+            'Home Score': home_points,
+            'Away Score': away_points,
+            'Plus/Minus': home_points - away_points
+        }
+
+    def _stint_rows(self, df, game):
+        """One interval row per stint; a stint runs from the action that brought its lineups on"""
+        period = df['period'].to_numpy()
+        time_actual = df['timeActual'].to_numpy() if 'timeActual' in df else np.full(len(df), None)
+        first_rows = game.timeline['first_row']
+        if not len(first_rows):
+            return []
+        period_first = np.append(True, period[first_rows[1:]] != period[first_rows[:-1]])
+        starts = np.where(period_first, first_rows, np.maximum(first_rows - 1, 0))
+        period_last = np.searchsorted(period, period[first_rows], side='right') - 1
+        ends = np.where(np.append(~period_first[1:], False), np.append(starts[1:], 0), period_last)
+        rows = []
+        for stint, start, end in zip(game.stints.itertuples(), starts, ends):
+            rows.append(self._stint_row(time_actual[start], time_actual[end],
+                                        game.lineup_ids(stint.home_lineup, HOME),
+                                        game.lineup_ids(stint.away_lineup, AWAY),
+                                        int(stint.home_points), int(stint.away_points)))
+        return rows
+
+    def _annotate(self, df, game, new):
+        """The actions in new, in df order, with the lineups after each and the change in home margin"""
+        by_number = {action['actionNumber']: action for action in new}
+        is_sub = df['actionType'].eq('substitution').to_numpy()
+        # A sub moved after a free throw carries the score from before it
+        scored = np.maximum.accumulate(np.where(~is_sub, np.arange(len(df)), 0))
+        margin = (df['scoreHome'].to_numpy() - df['scoreAway'].to_numpy())[scored]
+        plus_minus = np.diff(np.concatenate(([0], margin)))
+        annotated = []
+        action_numbers = df['actionNumber'].to_numpy()
+        for i in np.flatnonzero(np.isin(action_numbers, list(by_number))):
+            row = dict(by_number[action_numbers[i]])
+            for side in (HOME, AWAY):
+                names = self.lineup_names(game.lineup_ids(game.timeline[side][i], side))
+                for k, name in enumerate(names[:5]):
+                    row[f'{side}player{k + 1}'] = name
+            row['plus_minus'] = int(plus_minus[i])
+            annotated.append(row)
+        return annotated
+
+    def consume(self, actions):
+        """
+        Rebuild the game's stints from the full feed if it has actions not
+        seen yet; returns a PbpUpdate with those actions annotated and the
+        stints of periods that ended since the last call.
+        """
+        # lineups.stints builds on this module
+        from lineups.stints import build_stints
+
+        new = self.new_actions(actions)
+        if not new:
+            return PbpUpdate([], [])
+        df = normalize_actions(actions)
+        starters = None
+        if len(self.home_starters) == 5 and len(self.away_starters) == 5:
+            starters = (self.home_starters, self.away_starters)
+        game = build_stints(df, self.game_id, self.home_team_id, self.away_team_id, starters=starters)
+        rows = self._stint_rows(df, game)
+
+        # Starters of the current period are inferred from its actions, so its stints stay open until it ends
+        period = df['period'].to_numpy()
+        current = period[-1]
+        sub_type = df['subType'] if 'subType' in df else pd.Series(None, index=df.index, dtype=object)
+        ended = ((df['actionType'] == 'period') & (sub_type == 'end') & (df['period'] == current)).any()
+        final = len(rows) if ended else int((game.stints['period'].to_numpy() < current).sum())
+        stints = rows[self.emitted:final]
+        self.emitted = max(self.emitted, final)
+        self.open_rows = rows[final:]
+
+        annotated = self._annotate(df, game, new)
+        self.last_action_number = max(self.last_action_number, int(df['actionNumber'].max()))
+        return PbpUpdate(annotated, stints)
+
+    def open_stints(self):
+        """The current period's stints up to the last applied action (empty between periods)"""
+        return list(self.open_rows)
+
+    def fetch(self):
+        """Conditional GET of the feed; returns (cache entry, modified)"""
+        return conditional_get(self.url)
+
+    def poll(self):
+        """Fetch the play-by-play feed (conditional GET) and apply what is new"""
+        entry, modified = self.fetch()
+        if not modified and self.last_action_number:
+            return PbpUpdate([], [])
+        return self.consume(entry.json()['game']['actions'])
@@ -0,0 +1,192 @@
+"""
+One live ingestion pass per tick, fanned out to every derived in-game table.
+
+Each tick fetches the boxscore and (when a producer needs it) the play-by-play
+feed once, parses them once, and hands the result to the registered producers:
+the Supabase stat lines, the lineup intervals, the selected-player card CSV and
+the SQLite player_stats table all read from the same Tick instead of each
+script downloading the feeds and building its own player maps.
+
+    pipeline = LivePipeline(game_id, team='MIN')
+    pipeline.register(SupabaseStatLines(supabase))
+    pipeline.register(LineupIntervals(output_dir))
+    pipeline.run()
+
+A producer is any callable taking a Tick; set needs_pbp = True on it to have
+the play-by-play feed polled as well.
+"""
+import logging
+import time
+
+import pandas as pd
+import requests
+
+from .boxscore import ERROR_INTERVAL, STATUS_FINAL, STATUS_SCHEDULED, BoxscorePoller, PollSchedule, team_side
+from .metrics import TickTimer, parse_http_date
+from .pbp import PbpUpdate, PlayByPlayConsumer
+
+logger = logging.getLogger(__name__)
+
+
+class Tick:
+    """Everything one pass over the feeds produced, shared by all producers"""
+
+    def __init__(self, game_id, team, game, modified, changed, deltas, stat_lines, pbp, open_stints, first):
+        self.game_id = game_id
+        self.team = team
+        self.game = game
+        self.modified = modified
+        # Team stat lines that changed since the last tick, and all of them
+        self.changed = changed
+        self.stat_lines = stat_lines
+        # Player -> only the fields that changed (every field for a player seen for the first time)
+        self.deltas = deltas
+        # PbpUpdate with the new actions and the stints of ended periods (empty if nothing needs pbp)
+        self.pbp = pbp
+        # The current period's lineup stints, the last one still on the floor
+        self.open_stints = open_stints
+        self.first = first
+
+    @property
+    def side(self):
+        return team_side(self.game, self.team)
+
+    @property
+    def is_final(self):
+        return self.game.get('gameStatus') == STATUS_FINAL
+
+    def changed_df(self):
+        return pd.DataFrame(self.changed)
+
+    def stat_lines_df(self):
+        return pd.DataFrame(list(self.stat_lines.values()))
+
+
+def _producer_key(producer):
+    return getattr(producer, '__name__', type(producer).__name__)
+
+
+class LivePipeline:
+    """Polls one game's feeds and fans each tick out to the registered producers; team=None covers both teams"""
+
+    def __init__(self, game_id, team='MIN', metrics=None, checkpoint=None):
+        self.game_id = game_id
+        self.team = team
+        # LatencyMetrics for the game, or None to skip recording
+        self.metrics = metrics
+        # Checkpoint to resume from and save to after each tick, or None
+        self.checkpoint = checkpoint
+        self.boxscore = BoxscorePoller(game_id, team=team)
+        self.pbp = None
+        self.schedule = PollSchedule()
+        self.producers = []
+        self._first = True
+        self._producer_states = {}
+        if checkpoint is not None:
+            self._restore(checkpoint.load())
+
+    def _restore(self, state):
+        if state is None:
+            return
+        self.boxscore.stat_lines = state['stat_lines']
+        if state.get('pbp') is not None:
+            self.pbp = PlayByPlayConsumer.from_state(state['pbp'])
+        self._producer_states = state.get('producers', {})
+        self._first = False
+        logger.info(f"Resumed {self.game_id} from checkpoint at action "
+                    f"{self.pbp.last_action_number if self.pbp is not None else 0}")
+
+    def _save(self):
+        self.checkpoint.save({
+            'stat_lines': self.boxscore.stat_lines,
+            'pbp': self.pbp.to_state() if self.pbp is not None else None,
+            'producers': {_producer_key(p): p.state() for p in self.producers if hasattr(p, 'state')},
+        })
+
+    def register(self, producer):
+        """Add a producer; one with state()/restore(state) methods is carried through checkpoints"""
+        self.producers.append(producer)
+        saved = self._producer_states.get(_producer_key(producer))
+        if saved is not None and hasattr(producer, 'restore'):
+            producer.restore(saved)
+        return producer
+
+    @property
+    def needs_pbp(self):
+        return any(getattr(p, 'needs_pbp', False) for p in self.producers)
+
+    def _poll_pbp(self, game, timer):
+        if not self.needs_pbp or game.get('gameStatus') == STATUS_SCHEDULED:
+            return PbpUpdate([], [])
+        if self.pbp is None:
+            # Starters are only known once the boxscore has been published for the game
+            self.pbp = PlayByPlayConsumer.from_boxscore(game)
+
+        with timer.span('fetch'):
+            entry, modified = self.pbp.fetch()
+        timer.fetched(modified)
+        if not modified and self.pbp.last_action_number:
+            return PbpUpdate([], [])
+        with timer.span('parse'):
+            actions = entry.json()['game']['actions']
+        with timer.span('derive'):
+            update = self.pbp.consume(actions)
+        timer.observe_actions(update.actions)
+        return update
+
+    def tick(self):
+        """One pass: fetch and parse each feed once, then run every producer on the result"""
+        timer = self.metrics.start_tick() if self.metrics is not None else TickTimer()
+        with timer.span('fetch'):
+            entry, modified = self.boxscore.fetch()
+        timer.fetched(modified)
+        timer.published_at = parse_http_date(entry.last_modified)
+        with timer.span('parse'):
+            game = entry.json()['game']
+        with timer.span('derive'):
+            game, modified, changed = self.boxscore.update(game, modified)
+        pbp = self._poll_pbp(game, timer)
+
+        open_stints = self.pbp.open_stints() if self.pbp is not None else []
+        tick = Tick(self.game_id, self.team, game, modified, changed, self.boxscore.deltas, self.boxscore.stat_lines,
+                    pbp, open_stints, self._first)
+        wrote = bool(changed or pbp or tick.is_final)
+        if wrote:
+            with timer.span('write'):
+                for producer in self.producers:
+                    try:
+                        producer(tick)
+                    except Exception as e:
+                        logger.exception(f"Producer {_producer_key(producer)} failed for {self.game_id}: {e}")
+            self._first = False
+        if wrote and self.checkpoint is not None:
+            self._save()
+        if self.metrics is not None:
+            self.metrics.finish_tick(timer, wrote)
+        return tick
+
+    def step(self):
+        """One tick with error handling; returns the seconds to wait before the next one, or None once final"""
+        try:
+            tick = self.tick()
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            logger.warning(f"Live poll for {self.game_id} failed: {e}")
+            return ERROR_INTERVAL
+
+        interval = self.schedule.next_interval(tick.game, tick.modified)
+        if interval is None:
+            logger.info(f"Game {self.game_id} is final")
+            if self.metrics is not None:
+                self.metrics.write_summary()
+            return None
+        logger.debug(f"{self.game_id} {tick.game.get('gameStatusText')}: {len(tick.changed)} changed, "
+                     f"{len(tick.pbp.actions)} new actions, next poll in {interval:.0f}s")
+        return interval
+
+    def run(self):
+        """Tick until the game is final"""
+        while True:
+            interval = self.step()
+            if interval is None:
+                return
+            time.sleep(interval)
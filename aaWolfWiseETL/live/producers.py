@@ -0,0 +1,189 @@
+"""
+Derived in-game tables fed by LivePipeline.
+
+Each producer is called with the Tick of every pass that changed something and
+writes its own output from the shared, already-parsed feeds.
+"""
+import logging
+import os
+import sqlite3
+
+import pandas as pd
+
+from common.game_archive import get_default_archive
+from .pbp import boxscore_player_names
+
+logger = logging.getLogger(__name__)
+
+STAT_LINE_COLUMNS = ['Player', 'PTS', 'REB', 'AST', 'BLK', 'STL', 'TOV', 'FGs', 'threePt', 'plusMinusPoints']
+
+# Default selections for the player card graphic
+SELECTED_PLAYER_STATS = {
+    'Anthony Edwards': ['PTS', 'REB', 'AST', 'plusMinusPoints'],
+    'Julius Randle': ['PTS', 'AST', 'STL', 'plusMinusPoints'],
+    'Rudy Gobert': ['PTS', 'REB', 'FGs', 'plusMinusPoints'],
+    'Mike Conley': ['PTS', 'AST', 'threePt', 'plusMinusPoints'],
+    'Jaden McDaniels': ['PTS', 'REB', 'FGs', 'plusMinusPoints'],
+}
+
+
+class StatLinesCsv:
+    """Every tracked stat line as a CSV, rewritten whenever one changes"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, tick):
+        if not tick.changed:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tick.stat_lines_df().to_csv(self.path, index=False)
+
+
+class ArchiveFinalGame:
+    """Freezes the game's full play-by-play into the game archive once it is final"""
+
+    def __init__(self, archive=None):
+        self.archive = archive or get_default_archive()
+
+    def __call__(self, tick):
+        if tick.is_final and not self.archive.has(tick.game_id):
+            self.archive.fetch_pbp(tick.game_id)
+
+
+def expand_intervals(intervals_df, player_names, selected_players=None):
+    """
+    One column per player from the stints' lineup keys, plus 'All Players Present':
+    whether every one of selected_players (names) was on the floor during the
+    stint, or left empty for an Excel formula when no players are selected.
+    A selected name not in player_names raises ValueError.
+    """
+    expanded = intervals_df.drop(columns=['Home IDs', 'Away IDs'])
+    for side in ('Home', 'Away'):
+        players = pd.DataFrame([[player_names.get(pid, "Unknown Player") for pid in ids]
+                                for ids in intervals_df[f'{side} IDs']], index=intervals_df.index)
+        expanded = expanded.join(players.rename(columns=lambda x: f'{side} Player {x + 1}'))
+    if selected_players:
+        ids_by_name = {name: pid for pid, name in player_names.items()}
+        unknown = [name for name in selected_players if name not in ids_by_name]
+        if unknown:
+            raise ValueError(f"Unknown selected players: {', '.join(unknown)}")
+        selected = {ids_by_name[name] for name in selected_players}
+        expanded['All Players Present'] = [selected <= set(home) | set(away) for home, away
+                                           in zip(intervals_df['Home IDs'], intervals_df['Away IDs'])]
+    else:
+        # Populated later in Excel with a formula for the user-selected players
+        expanded['All Players Present'] = ''
+    return expanded
+
+
+class LineupIntervals:
+    """Lineup stints with their plus-minus, rewritten on the first tick, whenever the lineups change and at the final"""
+
+    needs_pbp = True
+
+    def __init__(self, output_dir, selected_players=None):
+        self.output_dir = output_dir
+        # Names whose stints together are flagged in 'All Players Present'
+        self.selected_players = selected_players
+        self.stints = []
+        # Number of open stints in the last write; a new one means the lineups changed
+        self.open_count = 0
+
+    def state(self):
+        return {'stints': self.stints, 'open_count': self.open_count}
+
+    def restore(self, state):
+        self.stints = state['stints']
+        self.open_count = state['open_count']
+
+    def __call__(self, tick):
+        if not (tick.first or tick.pbp.stints or tick.is_final or len(tick.open_stints) != self.open_count):
+            return
+        self.stints.extend(tick.pbp.stints)
+        self.open_count = len(tick.open_stints)
+        rows = self.stints + tick.open_stints
+        if not rows:
+            return
+
+        intervals_df = pd.DataFrame(rows)
+        os.makedirs(self.output_dir, exist_ok=True)
+        intervals_df.drop(columns=['Home IDs', 'Away IDs']).to_excel(
+            os.path.join(self.output_dir, 'lineup_intervals_plus_minus.xlsx'), index=False)
+        expand_intervals(intervals_df, boxscore_player_names(tick.game), self.selected_players).to_excel(
+            os.path.join(self.output_dir, 'lineup_intervals_plus_minus_expanded.xlsx'), index=False)
+
+
+class SelectedPlayerCard:
+    """
+    The selected players' chosen stats as a single-row CSV for the graphics template.
+
+    stats_selected maps each player to the stat line fields to show and defaults
+    to SELECTED_PLAYER_STATS.
+    """
+
+    def __init__(self, path, stats_selected=None):
+        self.path = path
+        self.stats_selected = stats_selected or SELECTED_PLAYER_STATS
+
+    def __call__(self, tick):
+        if not tick.changed:
+            return
+        header = []
+        formatted_data = []
+        for i, (player, stats) in enumerate(self.stats_selected.items(), start=1):
+            line = tick.stat_lines.get(player)
+            if line is None:
+                logger.warning(f"{player} not in the {tick.team} boxscore")
+                continue
+            header.append(f'Player{i}')
+            formatted_data.append(player)
+            for j, stat in enumerate(stats, start=1):
+                suffix = '' if j == 1 else f' {j}'
+                header.extend([f'Field{i}{suffix}', f'Value{i}{suffix}'])
+                formatted_data.extend([stat, line[stat]])
+
+        with open(self.path, 'w') as file:
+            file.write(','.join(header) + '\n')
+            file.write(','.join(str(item) for item in formatted_data))
+
+
+class SqlitePlayerStats:
+    """Keeps the player_stats table in a SQLite database in step with the team's stat lines, cell by cell"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def __call__(self, tick):
+        if not tick.changed:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS player_stats (
+                    {', '.join(f'{column} TEXT' for column in STAT_LINE_COLUMNS)}
+                )
+            ''')
+            if tick.first:
+                # New game: clear the previous one's rows
+                cursor.execute('DELETE FROM player_stats')
+            for player, cells in tick.deltas.items():
+                cells = {field: value for field, value in cells.items() if field in STAT_LINE_COLUMNS[1:]}
+                if not cells:
+                    continue
+                cursor.execute(
+                    f"UPDATE player_stats SET {', '.join(f'{field} = ?' for field in cells)} WHERE Player = ?",
+                    (*cells.values(), player)
+                )
+                if cursor.rowcount == 0:
+                    # Player not in the table yet
+                    line = tick.stat_lines[player]
+                    cursor.execute(
+                        f"INSERT INTO player_stats ({', '.join(STAT_LINE_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' for _ in STAT_LINE_COLUMNS)})",
+                        tuple(line[column] for column in STAT_LINE_COLUMNS)
+                    )
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,235 @@
+"""
+Change-only push of live stat lines to subscribers.
+
+The live pipeline publishes, per tick, only the stat line cells that changed
+(StatLinePublisher). Subscribers first get a snapshot of every player and then
+one patch per tick, so a client updates the cells it is told about instead of
+re-reading the whole table.
+
+Channel is the in-process broker; serve_sse() exposes it as a Server-Sent Events
+endpoint (GET /events/<topic>) for other processes such as the Streamlit app,
+and LiveStatLines is the client side, kept current on a background thread from
+either a Channel or an SSE URL.
+
+Messages are dicts:
+
+    {'type': 'snapshot', 'topic': ..., 'players': {player: {field: value, ...}}}
+    {'type': 'patch', 'topic': ..., 'players': {player: {changed field: value}}}
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Patches buffered per subscriber before it is considered stalled and dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+# Seconds between keep-alive comments on idle SSE connections
+SSE_KEEPALIVE = 15
+
+
+def apply_patch(players, patch):
+    """Merge a snapshot or patch's players into a {player: stat line} dict in place"""
+    for player, cells in patch.items():
+        players.setdefault(player, {}).update(cells)
+    return players
+
+
+class Subscription:
+    def __init__(self, channel, topic):
+        self.channel = channel
+        self.topic = topic
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def get(self, timeout=None):
+        """Next message, or None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.closed = True
+        self.channel._unsubscribe(self)
+
+
+class Channel:
+    """In-process pub/sub keeping the latest full state of each topic for new subscribers"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic):
+        subscription = Subscription(self, topic)
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(subscription)
+            players = {player: dict(line) for player, line in self._state.get(topic, {}).items()}
+        subscription.queue.put({'type': 'snapshot', 'topic': topic, 'players': players})
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+
+    def publish(self, topic, players, snapshot=False):
+        """Publish changed cells ({player: {field: value}}); snapshot=True replaces the topic's state"""
+        message = {'type': 'snapshot' if snapshot else 'patch', 'topic': topic, 'players': players}
+        with self._lock:
+            if snapshot:
+                self._state[topic] = {player: dict(line) for player, line in players.items()}
+            else:
+                apply_patch(self._state.setdefault(topic, {}), players)
+            subscribers = list(self._subscribers.get(topic, []))
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                logger.warning(f"Dropping stalled subscriber to {topic}")
+                subscription.close()
+
+    def topics(self):
+        with self._lock:
+            return list(self._state)
+
+
+_default_channel = None
+_default_channel_lock = threading.Lock()
+
+
+def get_default_channel():
+    global _default_channel
+    with _default_channel_lock:
+        if _default_channel is None:
+            _default_channel = Channel()
+        return _default_channel
+
+
+class StatLinePublisher:
+    """
+    Producer publishing each tick's changed stat line cells on a channel topic
+    (the game ID by default). Its first call publishes a full snapshot, since
+    the channel's state only lives as long as the process and a pipeline
+    resumed from a checkpoint starts past the game's first tick.
+    """
+
+    def __init__(self, channel=None, topic=None):
+        self.channel = channel or get_default_channel()
+        self.topic = topic
+        self._published = False
+
+    def __call__(self, tick):
+        topic = self.topic or tick.game_id
+        if tick.first or not self._published:
+            self.channel.publish(topic, tick.stat_lines, snapshot=True)
+            self._published = True
+        elif tick.deltas:
+            self.channel.publish(topic, tick.deltas)
+
+
+class _EventsHandler(BaseHTTPRequestHandler):
+    channel = None
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'events':
+            self.send_error(404)
+            return
+        subscription = self.channel.subscribe(parts[1])
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        try:
+            while not subscription.closed:
+                message = subscription.get(timeout=SSE_KEEPALIVE)
+                if message is None:
+                    self.wfile.write(b': keep-alive\n\n')
+                else:
+                    self.wfile.write(f"event: {message['type']}\ndata: {json.dumps(message)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            subscription.close()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_sse(channel=None, port=8765, host='127.0.0.1'):
+    """Serve GET /events/<topic> as Server-Sent Events on a background thread; returns the server"""
+    handler = type('EventsHandler', (_EventsHandler,), {'channel': channel or get_default_channel()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='live-sse', daemon=True).start()
+    logger.info(f"Live stat lines on http://{host}:{port}/events/<game_id>")
+    return server
+
+
+def _sse_messages(url):
+    """Decoded messages from a local SSE endpoint; ends when the connection closes"""
+    with requests.get(url, stream=True, timeout=(5, SSE_KEEPALIVE * 2)) as response:
+        response.raise_for_status()
+        data = []
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith('data:'):
+                data.append(line[5:].strip())
+            elif not line and data:
+                yield json.loads('\n'.join(data))
+                data = []
+
+
+class LiveStatLines:
+    """
+    Client-side copy of a topic's stat lines, patched in place on a background
+    thread. source is a Channel or the URL of an SSE endpoint; version goes up
+    by one with every message applied.
+    """
+
+    def __init__(self, source, topic=None):
+        self.source = source
+        self.topic = topic
+        self.players = {}
+        self.version = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self._listen, name='live-stat-lines', daemon=True).start()
+
+    def _apply(self, message):
+        with self._lock:
+            if message['type'] == 'snapshot':
+                self.players = {}
+            apply_patch(self.players, message['players'])
+            self.version += 1
+
+    def _listen(self):
+        if isinstance(self.source, Channel):
+            subscription = self.source.subscribe(self.topic)
+            while not subscription.closed:
+                message = subscription.get()
+                if message is not None:
+                    self._apply(message)
+            return
+        while True:
+            try:
+                for message in _sse_messages(self.source):
+                    self._apply(message)
+            except Exception as e:
+                logger.warning(f"Live stat line stream interrupted: {e}")
+            time.sleep(SSE_KEEPALIVE)
+
+    def rows(self):
+        """Current stat lines as a list of dicts"""
+        with self._lock:
+            return [dict(line, Player=player) for player, line in self.players.items()]
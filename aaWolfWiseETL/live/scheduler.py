@@ -0,0 +1,123 @@
+"""
+Multi-game live mode: every NBA game in progress, polled concurrently.
+
+LiveScheduler watches today's scoreboard (through the schedule index) for games
+that have tipped off, builds a LivePipeline for each one with make_pipeline(game)
+and drives all of them from one asyncio loop. Each game keeps its own state
+machine and poll schedule; the blocking feed requests run on a shared thread
+pool, with at most MAX_PER_HOST of them in flight per host and the request rate
+still capped by the cdn.nba.com token bucket every request goes through. A
+game stops being followed only once its pipeline reports it final; a task that
+crashes is restarted, with backoff, on the same pipeline.
+
+    def make_pipeline(game):
+        pipeline = LivePipeline(game.game_id, team=None)
+        pipeline.register(LineupIntervals(os.path.join(output_dir, game.game_id)))
+        return pipeline
+
+    LiveScheduler(make_pipeline).run()
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from common.fetch_engine import DEFAULT_MAX_PER_HOST, MAX_PER_HOST
+from common.schedule import load_schedule
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the scoreboard for games that have tipped off or finished
+DISCOVERY_INTERVAL = 30
+
+LIVE_HOST = 'cdn.nba.com'
+
+# A game whose task crashed is restarted after RESTART_DELAY seconds, doubling
+# with each crash in a row up to MAX_RESTART_DELAY
+RESTART_DELAY = 5
+MAX_RESTART_DELAY = 300
+
+
+class LiveScheduler:
+    def __init__(self, make_pipeline, teams=None, max_in_flight=None):
+        """
+        make_pipeline(game) returns the LivePipeline for a schedule Game; teams
+        limits the games followed to those involving one of the tricodes.
+        """
+        self.make_pipeline = make_pipeline
+        self.teams = set(teams) if teams else None
+        self.max_in_flight = max_in_flight or MAX_PER_HOST.get(LIVE_HOST, DEFAULT_MAX_PER_HOST)
+        self.pipelines = {}
+        self._tasks = {}
+        self._finished = set()
+        # game_id -> crashes since the last successful step
+        self._failures = {}
+
+    def _wanted(self, game):
+        return self.teams is None or game.home in self.teams or game.away in self.teams
+
+    def discover(self):
+        """Live games that are not being followed yet"""
+        games = load_schedule().live_games()
+        return [g for g in games
+                if self._wanted(g) and g.game_id not in self._tasks and g.game_id not in self._finished]
+
+    def restart_delay(self, game_id):
+        """Seconds to wait before restarting a game's crashed task"""
+        failures = self._failures.get(game_id, 1)
+        return min(RESTART_DELAY * 2 ** (failures - 1), MAX_RESTART_DELAY)
+
+    async def _follow(self, pipeline, loop, executor, in_flight, delay=0):
+        """Step the pipeline until it reports the game final (the task then returns None)"""
+        await asyncio.sleep(delay)
+        while True:
+            async with in_flight:
+                interval = await loop.run_in_executor(executor, pipeline.step)
+            self._failures.pop(pipeline.game_id, None)
+            if interval is None:
+                return
+            await asyncio.sleep(interval)
+
+    async def _run(self, until_idle):
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='live') as executor:
+            while True:
+                try:
+                    new_games = await loop.run_in_executor(executor, self.discover)
+                except Exception as e:
+                    logger.warning(f"Could not check the scoreboard for live games: {e}")
+                    new_games = []
+
+                for game in new_games:
+                    pipeline = self.make_pipeline(game)
+                    self.pipelines[game.game_id] = pipeline
+                    self._tasks[game.game_id] = asyncio.create_task(
+                        self._follow(pipeline, loop, executor, in_flight))
+                    logger.info(f"Following {game}")
+
+                for game_id, task in list(self._tasks.items()):
+                    if not task.done():
+                        continue
+                    error = task.exception()
+                    if error is None:
+                        # Only a pipeline that reported the game final ends it
+                        del self._tasks[game_id]
+                        self._finished.add(game_id)
+                        continue
+                    # The pipeline keeps its state, so a restarted task carries on where it stopped
+                    self._failures[game_id] = self._failures.get(game_id, 0) + 1
+                    delay = self.restart_delay(game_id)
+                    logger.error(f"Game {game_id} crashed ({error!r}); restarting in {delay:.0f}s")
+                    self._tasks[game_id] = asyncio.create_task(
+                        self._follow(self.pipelines[game_id], loop, executor, in_flight, delay))
+
+                if until_idle and not self._tasks:
+                    return
+                await asyncio.sleep(DISCOVERY_INTERVAL)
+
+    def run(self, until_idle=True):
+        """
+        Follow live games until none are left in progress (or forever when
+        until_idle is False, picking up games as they tip off).
+        """
+        asyncio.run(self._run(until_idle))
@@ -0,0 +1,205 @@
+"""
+Compact score / lead time series, one per game, for lead-tracker charts.
+
+ScoreSeries keeps three parallel numpy arrays (elapsed game seconds, home score,
+away score) with one point per scoring change. Points are only ever appended
+as play-by-play actions arrive, so a live game is extended in place each tick,
+and a whole season of games stays small enough to keep in memory (a game is a
+few hundred points). Lookups such as the lead at a given time are binary
+searches; spans such as time spent trailing by 20+ or the largest run are
+single vectorized passes over the arrays.
+
+    series = ScoreSeries(game_id)
+    series.extend(actions)
+    series.lead_at(24 * 60)          # home lead at halftime
+    series.time_with_lead(max_lead=-20, side='away')
+"""
+import numpy as np
+import pandas as pd
+
+from .game_clock import elapsed_array, elapsed_seconds, parse_clock
+
+HOME = 'home'
+AWAY = 'away'
+
+_INITIAL_CAPACITY = 256
+
+
+def _score(value):
+    return int(value) if value not in (None, '') else 0
+
+
+class ScoreSeries:
+    """Append-only score by elapsed seconds for one game"""
+
+    def __init__(self, game_id, capacity=_INITIAL_CAPACITY):
+        self.game_id = game_id
+        self._elapsed = np.zeros(capacity, dtype=np.float32)
+        self._home = np.zeros(capacity, dtype=np.int16)
+        self._away = np.zeros(capacity, dtype=np.int16)
+        # Tip-off at 0-0
+        self._n = 1
+        # Game time of the last action seen, so the final span has an end
+        self.end = 0.0
+        self.last_action_number = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def elapsed(self):
+        return self._elapsed[:self._n]
+
+    @property
+    def home(self):
+        return self._home[:self._n]
+
+    @property
+    def away(self):
+        return self._away[:self._n]
+
+    def lead(self, side=HOME):
+        """Lead from one side's point of view at each point"""
+        lead = self.home.astype(np.int32) - self.away
+        return lead if side == HOME else -lead
+
+    def _grow(self):
+        capacity = len(self._elapsed) * 2
+        for name in ('_elapsed', '_home', '_away'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def append(self, elapsed, home, away):
+        """Record the score at a game time; only scoring changes add a point"""
+        self.end = max(self.end, elapsed)
+        i = self._n - 1
+        if home == self._home[i] and away == self._away[i]:
+            return
+        if self._n == len(self._elapsed):
+            self._grow()
+        self._elapsed[self._n] = max(elapsed, self._elapsed[i])
+        self._home[self._n] = home
+        self._away[self._n] = away
+        self._n += 1
+
+    def extend(self, actions):
+        """Apply liveData play-by-play actions not seen yet (by actionNumber)"""
+        for action in actions:
+            number = action.get('actionNumber', 0)
+            if number and number <= self.last_action_number:
+                continue
+            self.append(elapsed_seconds(action['period'], action.get('clock')),
+                        _score(action.get('scoreHome')), _score(action.get('scoreAway')))
+            if number:
+                self.last_action_number = number
+
+    @classmethod
+    def from_arrays(cls, game_id, period, clock, score_home, score_away):
+        """Build from the columns of one game's play-by-play frame, in game order"""
+        elapsed = elapsed_array(period, np.fromiter(map(parse_clock, clock), dtype=np.float64, count=len(clock)))
+        home = pd.to_numeric(pd.Series(score_home), errors='coerce').ffill().fillna(0).to_numpy(dtype=np.int64)
+        away = pd.to_numeric(pd.Series(score_away), errors='coerce').ffill().fillna(0).to_numpy(dtype=np.int64)
+        return cls.from_scores(game_id, elapsed, home, away)
+
+    @classmethod
+    def from_scores(cls, game_id, elapsed, home, away):
+        """
+        Build from elapsed seconds and integer scores for one game, in game
+        order: the points append() would add, in one vectorized pass.
+        """
+        # A point per scoring change after the 0-0 tip-off, never earlier than the one before it
+        home = np.concatenate(([0], home))
+        away = np.concatenate(([0], away))
+        changed = np.flatnonzero((home[1:] != home[:-1]) | (away[1:] != away[:-1]))
+        n = len(changed) + 1
+        series = cls(game_id, capacity=max(n, _INITIAL_CAPACITY))
+        series._elapsed[1:n] = np.maximum.accumulate(np.maximum(elapsed[changed], 0))
+        series._home[1:n] = home[changed + 1]
+        series._away[1:n] = away[changed + 1]
+        series._n = n
+        series.end = max(float(elapsed.max()), 0.0) if len(elapsed) else 0.0
+        return series
+
+    def lead_at(self, t, side=HOME):
+        """Lead at game time t (seconds since tip-off)"""
+        i = int(np.searchsorted(self.elapsed, t, side='right')) - 1
+        lead = int(self._home[max(i, 0)]) - int(self._away[max(i, 0)])
+        return lead if side == HOME else -lead
+
+    def durations(self):
+        """Seconds each point's score stood for, the last one up to the latest action"""
+        return np.diff(self.elapsed, append=max(self.end, float(self.elapsed[-1])))
+
+    def time_with_lead(self, min_lead=None, max_lead=None, side=HOME):
+        """Seconds during which side's lead was within [min_lead, max_lead]"""
+        lead = self.lead(side)
+        mask = np.ones(len(lead), dtype=bool)
+        if min_lead is not None:
+            mask &= lead >= min_lead
+        if max_lead is not None:
+            mask &= lead <= max_lead
+        return float(self.durations()[mask].sum())
+
+    def largest_lead(self, side=HOME):
+        return int(self.lead(side).max())
+
+    def largest_run(self):
+        """
+        Longest unanswered scoring run as (side, points, first basket time, last
+        basket time); None before anyone has scored.
+        """
+        if self._n < 2:
+            return None
+        home_points = np.diff(self.home.astype(np.int32))
+        away_points = np.diff(self.away.astype(np.int32))
+        # +1 where only home scored, -1 where only away scored (0 for simultaneous corrections)
+        scorer = np.sign(home_points - away_points) * ((home_points > 0) ^ (away_points > 0))
+        if not scorer.any():
+            return None
+        # A new run starts whenever the scoring side changes
+        run_id = np.concatenate(([0], np.cumsum(scorer[1:] != scorer[:-1])))
+        points = np.where(scorer > 0, home_points, np.where(scorer < 0, away_points, 0))
+        totals = np.bincount(run_id, weights=points)
+        best = int(totals.argmax())
+        members = np.flatnonzero(run_id == best)
+        side = HOME if scorer[members[0]] > 0 else AWAY
+        return side, int(totals[best]), float(self.elapsed[members[0] + 1]), float(self.elapsed[members[-1] + 1])
+
+
+class SeasonSeries:
+    """ScoreSeries for many games, keyed by game ID"""
+
+    def __init__(self):
+        self.games = {}
+
+    def __getitem__(self, game_id):
+        return self.games[game_id]
+
+    def __contains__(self, game_id):
+        return game_id in self.games
+
+    def __len__(self):
+        return len(self.games)
+
+    def get(self, game_id):
+        """The game's series, created empty on first use (for live games)"""
+        series = self.games.get(game_id)
+        if series is None:
+            series = self.games[game_id] = ScoreSeries(game_id)
+        return series
+
+    @classmethod
+    def from_frame(cls, df, game_column='gameid'):
+        """Build from a play-by-play frame holding many games, each sorted in game order"""
+        season = cls()
+        scores = df[['scoreHome', 'scoreAway']].apply(pd.to_numeric, errors='coerce')
+        scores = scores.groupby(df[game_column], sort=False).ffill().fillna(0).astype('int64')
+        # Whole-season columns once; each game is a slice of them
+        clock_seconds = df['clockSeconds'] if 'clockSeconds' in df else df['clock'].map(parse_clock)
+        elapsed = elapsed_array(df['period'].to_numpy(), clock_seconds.to_numpy())
+        home, away = scores['scoreHome'].to_numpy(), scores['scoreAway'].to_numpy()
+        for game_id, rows in df.groupby(game_column, sort=False).indices.items():
+            season.games[game_id] = ScoreSeries.from_scores(game_id, elapsed[rows], home[rows], away[rows])
+        return season
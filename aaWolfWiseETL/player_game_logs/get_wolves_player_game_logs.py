@@ -3,13 +3,19 @@ from nba_api.stats.static import teams
 import pandas as pd
 from datetime import datetime
 import logging
-import time
-from requests.exceptions import ReadTimeout, ConnectionError
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.nba_http import install_nba_api_session
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
+
 # Get Timberwolves team ID
 logger.info("Fetching Timberwolves team ID...")
 timberwolves = teams.find_teams_by_full_name('Minnesota Timberwolves')[0]
@@ -19,24 +25,8 @@ logger.info(f"Found Timberwolves ID: {team_id}")
 # Get current season in YYYY-YY format
 current_season = '2024-25'
 
-# Get Timberwolves roster with retry logic
-max_retries = 3
-retry_delay = 5  # seconds
-
-def get_data_with_retry(func, *args, **kwargs):
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Attempt {attempt + 1} of {max_retries}")
-            return func(*args, **kwargs)
-        except (ReadTimeout, ConnectionError) as e:
-            if attempt == max_retries - 1:
-                logger.error(f"Failed after {max_retries} attempts: {str(e)}")
-                raise
-            logger.warning(f"Attempt {attempt + 1} failed. Retrying in {retry_delay} seconds...")
-            time.sleep(retry_delay)
-
 logger.info("Fetching Timberwolves roster...")
-roster = get_data_with_retry(commonteamroster.CommonTeamRoster, team_id=team_id, season=current_season)
+roster = commonteamroster.CommonTeamRoster(team_id=team_id, season=current_season)
 wolves_players = roster.get_data_frames()[0]
 logger.info(f"Found {len(wolves_players)} players on roster")
 
@@ -50,9 +40,8 @@ for _, player in wolves_players.iterrows():
     
     logger.info(f"Fetching game logs for {player_name} (ID: {player_id})...")
     try:
-        # Get player's game log with retry logic
-        game_log = get_data_with_retry(
-            playergamelog.PlayerGameLog,
+        # Get player's game log
+        game_log = playergamelog.PlayerGameLog(
             player_id=player_id,
             season=current_season
         )
@@ -67,9 +56,6 @@ for _, player in wolves_players.iterrows():
         # Append to list
         all_game_logs.append(df)
         
-        # Add delay between requests to avoid rate limiting
-        time.sleep(1)
-        
     except Exception as e:
         logger.error(f"Error fetching data for {player_name}: {str(e)}")
         continue
@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import logging
@@ -6,6 +5,10 @@ import re
 from supabase import create_client
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
 
 # Configure logging
 logging.basicConfig(
@@ -25,11 +28,6 @@ supabase = create_client(supabase_url, supabase_key)
 # URL of the team leaderboard page (2024-25 season)
 URL = "https://www.basketball-reference.com/teams/MIN/2025.html"
 
-# Headers to mimic a real browser request
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-}
-
 def clean_stat_name(caption):
     """Extract clean stat name from caption"""
     # First try data-tip
@@ -102,7 +100,7 @@ def save_to_supabase(df):
 try:
     # Request the page content
     logger.info(f"Requesting URL: {URL}")
-    response = requests.get(URL, headers=HEADERS)
+    response = nba_http.get(URL)
     response.raise_for_status()
     
     # Extract the commented section
@@ -1,11 +1,14 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import uuid
 import os
+import sys
 from supabase import create_client
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
+
 # Load environment variables
 load_dotenv()
 
@@ -18,14 +21,9 @@ def scrape_team_leaders():
     # URL of the team leaders page
     url = "https://www.basketball-reference.com/teams/MIN/leaders_season.html"
     
-    # Send request with headers to avoid blocking
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
         # Fetch the page
-        response = requests.get(url, headers=headers)
+        response = nba_http.get(url)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
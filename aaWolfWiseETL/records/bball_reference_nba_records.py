@@ -1,12 +1,15 @@
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import os
+import sys
 from supabase import create_client
 from dotenv import load_dotenv
 import uuid
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
+
 # Load environment variables
 load_dotenv()
 
@@ -49,12 +52,8 @@ def clean_value(value):
 
 def scrape_stat_page(url, record_type):
     """Scrape a single stat page"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
+        response = nba_http.get(url)
         response.raise_for_status()
         
         # Ensure proper encoding of the response
@@ -195,7 +194,6 @@ def main():
         else:
             print(f"Failed to scrape data from {url}")
             failure_count += 1
-        time.sleep(2)  # Increased delay to be more conservative
     
     # Combine all DataFrames
     if all_data:
@@ -1,12 +1,16 @@
-import requests
+import os
+import sys
 from bs4 import BeautifulSoup
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import nba_http
+
 # URL of the Basketball Reference Leaders page
 URL = "https://www.basketball-reference.com/leaders/"
 
 # Request the page
-response = requests.get(URL, headers={"User-Agent": "Mozilla/5.0"})
+response = nba_http.get(URL)
 
 if response.status_code == 200:
     soup = BeautifulSoup(response.text, "html.parser")
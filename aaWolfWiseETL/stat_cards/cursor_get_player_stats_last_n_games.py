@@ -4,10 +4,17 @@ from datetime import datetime
 import os
 from supabase import create_client
 from dotenv import load_dotenv
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.nba_http import install_nba_api_session
 
 # Load environment variables
 load_dotenv()
 
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
+
 # Initialize Supabase client
 supabase_url = 'https://kuthirbcjtofsdwsfhkj.supabase.co'
 supabase_key = os.getenv('SUPABASE_KEY')
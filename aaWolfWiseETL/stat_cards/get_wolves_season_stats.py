@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import pandas as pd
 from nba_api.stats.endpoints import LeagueDashPlayerStats, CommonTeamRoster
-import time
 import logging
 from supabase import create_client
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.nba_http import install_nba_api_session
 
 # Configure logging to output progress messages
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,6 +21,7 @@ BASE_IMAGE_URL = "https://kuthirbcjtofsdwsfhkj.supabase.co/storage/v1/object/pub
 
 # Load environment variables and initialize Supabase client
 load_dotenv()
+install_nba_api_session()
 supabase_url = 'https://kuthirbcjtofsdwsfhkj.supabase.co'
 supabase_key = os.getenv('SUPABASE_KEY')
 supabase = create_client(supabase_url, supabase_key)
@@ -29,7 +33,6 @@ def fetch_timberwolves_stats(season=SEASON, team_id=TEAM_ID):
     the desired order and naming conventions.
     """
     logging.info("Starting to fetch Timberwolves stats for season %s", season)
-    time.sleep(1)
     
     # Fetch stats using LeagueDashPlayerStats
     logging.info("Fetching player stats from LeagueDashPlayerStats")
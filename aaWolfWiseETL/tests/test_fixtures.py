@@ -0,0 +1,64 @@
+import json
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from common import fixtures, nba_http
+from common.response_cache import ResponseCache
+
+URL = 'https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_0022400001.json'
+BODY = json.dumps({'game': {'actions': [{'actionNumber': 1}]}}).encode('utf-8')
+ETAG = '"v1"'
+
+
+def fake_server(adapter, request, **kwargs):
+    """cdn.nba.com stand-in: a 200 with an ETag, and a 304 when that ETag comes back"""
+    response = requests.Response()
+    response.url = request.url
+    response.request = request
+    if request.headers.get('If-None-Match') == ETAG:
+        response.status_code = 304
+        response._content = b''
+    else:
+        response.status_code = 200
+        response.headers['ETag'] = ETAG
+        response._content = BODY
+    return response
+
+
+@pytest.fixture
+def http_mode(tmp_path, monkeypatch):
+    """Switch WOLFWISE_HTTP_MODE with fresh sessions and a temporary fixture store"""
+    monkeypatch.setattr(HTTPAdapter, 'send', fake_server)
+    monkeypatch.setattr(fixtures, '_default_store', fixtures.FixtureStore(str(tmp_path / 'fixtures')))
+
+    def switch(mode):
+        nba_http.close_sessions()
+        monkeypatch.setenv('WOLFWISE_HTTP_MODE', mode)
+
+    yield switch
+    nba_http.close_sessions()
+
+
+def test_replay_with_cold_cache_serves_the_recorded_200_and_304(http_mode, tmp_path):
+    http_mode(fixtures.RECORD)
+    recording_cache = ResponseCache(str(tmp_path / 'record_cache'))
+    assert nba_http.conditional_get(URL, cache=recording_cache)[1] is True
+    # The revalidation's 304 is recorded next to the 200, not over it
+    assert nba_http.conditional_get(URL, cache=recording_cache)[1] is False
+
+    http_mode(fixtures.REPLAY)
+    cold_cache = ResponseCache(str(tmp_path / 'replay_cache'))
+    entry, modified = nba_http.conditional_get(URL, cache=cold_cache)
+    assert modified is True
+    assert entry.json() == json.loads(BODY)
+    entry, modified = nba_http.conditional_get(URL, cache=cold_cache)
+    assert modified is False
+    assert entry.json() == json.loads(BODY)
+
+
+def test_request_key_includes_validators():
+    plain = fixtures.request_key('GET', URL)
+    assert fixtures.request_key('GET', URL, headers={'If-None-Match': ETAG}) != plain
+    assert fixtures.request_key('GET', URL, headers={'Accept': '*/*'}) == plain
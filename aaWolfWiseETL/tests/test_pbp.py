@@ -0,0 +1,82 @@
+from live.pbp import PlayByPlayConsumer
+from test_stints import AWAY, AWAY_ID, HOME, HOME_ID, action, stints, sub
+
+
+def game_actions():
+    actions = []
+    action(actions, 1, 720, 'period', 'start')
+    action(actions, 1, 700, '2pt', 'jumpshot', 101, HOME_ID, home=2)
+    action(actions, 1, 650, 'foul', 'personal', 201, AWAY_ID, home=2)
+    action(actions, 1, 650, 'freethrow', '1 of 2', 102, HOME_ID, home=3)
+    # Made between the free throws, so it waits for the second one
+    sub(actions, 1, 650, 105, 106, HOME_ID, home=3)
+    action(actions, 1, 650, 'freethrow', '2 of 2', 102, HOME_ID, home=4)
+    action(actions, 1, 600, '2pt', 'jumpshot', 201, AWAY_ID, home=4, away=2)
+    sub(actions, 1, 550, 205, 206, AWAY_ID, home=4, away=2)
+    action(actions, 1, 500, '2pt', 'jumpshot', 202, AWAY_ID, home=4, away=4)
+    action(actions, 1, 0, 'period', 'end', home=4, away=4)
+    action(actions, 2, 720, 'period', 'start', home=4, away=4)
+    # A period-start sub; 102, 103, 106, 201, 202 and 204 record nothing in the period
+    sub(actions, 2, 720, 206, 205, AWAY_ID, home=4, away=4)
+    action(actions, 2, 690, '2pt', 'jumpshot', 101, HOME_ID, home=6, away=4)
+    action(actions, 2, 650, '2pt', 'jumpshot', 203, AWAY_ID, home=6, away=6)
+    sub(actions, 2, 600, 104, 107, HOME_ID, home=6, away=6)
+    action(actions, 2, 580, '2pt', 'jumpshot', 107, HOME_ID, home=8, away=6)
+    action(actions, 2, 0, 'period', 'end', home=8, away=6)
+    return actions
+
+
+def consumer():
+    names = {pid: f'P{pid}' for pid in HOME + AWAY}
+    teams = {**{pid: HOME_ID for pid in HOME}, **{pid: AWAY_ID for pid in AWAY}}
+    return PlayByPlayConsumer('g', HOME_ID, AWAY_ID, names, teams, HOME[:5], AWAY[:5])
+
+
+def batch_rows(actions):
+    game = stints(actions)
+    return [(list(game.lineup_ids(s.home_lineup, 'home')), list(game.lineup_ids(s.away_lineup, 'away')),
+             s.home_points, s.away_points) for s in game.stints.itertuples()]
+
+
+def live_rows(rows):
+    return [(r['Home IDs'], r['Away IDs'], r['Home Score'], r['Away Score']) for r in rows]
+
+
+def test_live_stints_match_build_stints_across_polls():
+    actions = game_actions()
+    live = consumer()
+    closed = []
+    # Polls ending mid free-throw sequence, mid sub batch and right after each period
+    for end in (4, 5, 9, 15, 18, len(actions)):
+        update = live.consume(actions[:end])
+        closed.extend(update.stints)
+        assert live_rows(closed + live.open_stints()) == batch_rows(actions[:end])
+
+    assert live.open_stints() == []
+    assert all(len(r['Home IDs']) == 5 and len(r['Away IDs']) == 5 for r in closed)
+    # Period 2 started with 206 back on the bench and 205 on the floor
+    assert closed[3]['Away IDs'] == [201, 202, 203, 204, 205]
+
+
+def test_only_ended_periods_are_returned():
+    actions = game_actions()
+    live = consumer()
+    assert live.consume(actions[:9]).stints == []
+    period_end = next(i for i, a in enumerate(actions) if a['actionType'] == 'period' and a['subType'] == 'end')
+    assert len(live.consume(actions[:period_end + 1]).stints) == 3
+    assert live.consume(actions[:period_end + 1]).stints == []
+
+
+def test_annotated_actions_carry_the_lineup_after_them():
+    actions = game_actions()
+    update = consumer().consume(actions)
+    by_number = {row['actionNumber']: row for row in update.actions}
+
+    def home(number):
+        return [by_number[number][f'homeplayer{k}'] for k in range(1, 6)]
+
+    # The second free throw still belongs to the five who were fouled; the subs come on after it
+    assert 'P105' in home(7) and by_number[7]['plus_minus'] == 1
+    assert 'P106' in home(6) and 'P105' not in home(6)
+    # The subs carry the free throw's score, so they don't move the margin
+    assert by_number[5]['plus_minus'] == 0 and by_number[6]['plus_minus'] == 0
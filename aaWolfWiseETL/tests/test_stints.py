@@ -0,0 +1,66 @@
+from lineups.keys import popcount
+from lineups.stints import build_stints
+from live.pbp import normalize_actions
+
+HOME_ID, AWAY_ID = 1610612750, 1610612747
+HOME = [101, 102, 103, 104, 105, 106, 107]
+AWAY = [201, 202, 203, 204, 205, 206, 207]
+
+
+def action(actions, period, clock, action_type, sub_type=None, person_id=0, team_id=None, home=0, away=0):
+    actions.append({
+        'actionNumber': len(actions) + 1,
+        'period': period,
+        'clock': f'PT{int(clock // 60):02d}M{clock % 60:05.2f}S',
+        'actionType': action_type,
+        'subType': sub_type,
+        'personId': person_id,
+        'teamId': team_id,
+        'location': {HOME_ID: 'h', AWAY_ID: 'v'}.get(team_id),
+        'scoreHome': str(home),
+        'scoreAway': str(away),
+        'shotResult': 'Made' if action_type == '2pt' else None,
+        'timeActual': f'2024-11-01T00:{len(actions):02d}:00Z',
+        'playerNameI': f'P{person_id}' if person_id else None,
+    })
+
+
+def sub(actions, period, clock, out, into, team_id, home=0, away=0):
+    action(actions, period, clock, 'substitution', 'out', out, team_id, home, away)
+    action(actions, period, clock, 'substitution', 'in', into, team_id, home, away)
+
+
+def stints(actions):
+    return build_stints(normalize_actions(actions), game_id='g', home_team_id=HOME_ID, away_team_id=AWAY_ID,
+                        starters=(HOME[:5], AWAY[:5]))
+
+
+def test_adjacent_sub_batches_at_different_clocks_are_separate_stints():
+    actions = []
+    action(actions, 1, 720, 'period', 'start')
+    action(actions, 1, 700, '2pt', 'jumpshot', 101, HOME_ID, home=2)
+    # Two sub groups with no other action between them: 120s and 170s elapsed
+    sub(actions, 1, 600, 105, 106, HOME_ID, home=2)
+    sub(actions, 1, 550, 104, 107, HOME_ID, home=2)
+    action(actions, 1, 500, '2pt', 'jumpshot', 201, AWAY_ID, home=2, away=2)
+    action(actions, 1, 0, 'period', 'end', home=2, away=2)
+
+    game = stints(actions)
+    table = game.stints
+    assert list(table['start']) == [0, 120, 170]
+    assert list(table['end']) == [120, 170, 720]
+    assert game.lineup_ids(table['home_lineup'][1]) == (101, 102, 103, 104, 106)
+    assert game.lineup_ids(table['home_lineup'][2]) == (101, 102, 103, 106, 107)
+    assert list(table['away_points']) == [0, 0, 2]
+
+
+def test_subs_at_the_same_clock_are_one_batch():
+    actions = []
+    action(actions, 1, 720, 'period', 'start')
+    sub(actions, 1, 600, 105, 106, HOME_ID)
+    sub(actions, 1, 600, 205, 206, AWAY_ID)
+    action(actions, 1, 0, 'period', 'end')
+
+    table = stints(actions).stints
+    assert list(table['start']) == [0, 120]
+    assert (popcount(table[['home_lineup', 'away_lineup']].to_numpy().ravel()) == 5).all()
@@ -2,6 +2,14 @@ import pandas as pd
 from nba_api.stats.endpoints import TeamInfoCommon
 from nba_api.stats.static import teams
 from nba_api.stats.endpoints import TeamGameLogs
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import install_nba_api_session
+
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
 
 
 # Get the list of NBA teams
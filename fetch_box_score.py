@@ -1,19 +1,14 @@
-import requests
+import os
+import sys
 import pandas as pd
 from openpyxl import load_workbook
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
 
 
-
-def fetch_nba_data(url, headers, params):
-    response = requests.get(url, headers=headers, params=params)
-    data = response.json()
-    return data
-
 def process_data(data, min_attempts):
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
+    df = nba_http.process_data(data)
     df_filtered = df[(df['FG3A'] >= min_attempts)]
     return df_filtered
 
@@ -72,24 +67,8 @@ def generate_summary_tab(excel_filename):
     else:
         print("No top 10 ranks found.")
 
-# Common headers and URL
+# Stats URL
 url = "https://stats.nba.com/stats/boxscoretraditionalv3"
-headers = {
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Chromium\";v=\"122\", \"Not A Brand\";v=\"24\", \"Google Chrome\";v=\"122\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-}
 
 params = {
     "GameID": "0022300873",
@@ -104,5 +83,5 @@ params = {
 
 
 # Fetch and process the first set of data
-data1 = fetch_nba_data(url, headers, params)
+data1 = nba_http.fetch_nba_data(url, params)
 save_to_excel(data1, '/Users/tonysantoorjian/Documents/game_log_stats.xlsx', 'Sheet1')
@@ -1,58 +1,20 @@
-import requests
+import os
+import sys
 import pandas as pd
 import numpy as np
-import io
 from nba_api.stats.static import teams
-from nba_api.stats.endpoints import leaguegamefinder
-import requests
-import pandas as pd
 from openpyxl import load_workbook
 
-# get game logs from the reg season
-gamefinder = leaguegamefinder.LeagueGameFinder(season_nullable='2023-24',
-                                              league_id_nullable='00',
-                                              season_type_nullable='Regular Season')
-games = gamefinder.get_data_frames()[0]
-# Get a list of distinct game ids
-game_ids = games['GAME_ID'].unique().tolist()
-
-#filter to TEAM_ABBREVIATION == 'MIN' and get the game ids
-games = games[games['TEAM_ABBREVIATION'] == 'MIN']
-game_ids = games['GAME_ID'].unique().tolist()
-
-#grab the most recent game
-game_id = game_ids[0]
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import fetch_nba_data
+from common.schedule import latest_game_id
 
+# Most recent Timberwolves game from the cached season schedule
+game_id = latest_game_id('MIN', season='2023-24', season_type='Regular Season')
 
-def fetch_nba_data(url, headers, params):
-    response = requests.get(url, headers=headers, params=params)
-    data = response.json()
-    return data
 
-def process_data(data):
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
-    return df
-
-# Common headers and URL
+# Boxscore URL
 url = "https://stats.nba.com/stats/boxscoretraditionalv3"
-headers = {
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Chromium\";v=\"122\", \"Not A Brand\";v=\"24\", \"Google Chrome\";v=\"122\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-}
 
 params = {
     "GameID": game_id,
@@ -87,7 +49,7 @@ def create_team_stats_df(team_data):
     df = pd.DataFrame(players_data)
     return df
 
-data = fetch_nba_data(url, headers, params)
+data = fetch_nba_data(url, params)
 # Check both home and away team for 'Minnesota'
 home_team_data = data['boxScoreTraditional']['homeTeam']
 away_team_data = data['boxScoreTraditional']['awayTeam']
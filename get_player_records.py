@@ -1,15 +1,18 @@
 from nba_api.stats.endpoints import (
     PlayerGameLog,
     PlayerCareerStats,
-    CommonTeamRoster,
     LeagueDashPlayerStats
 )
 from nba_api.stats.static import players, teams
 import pandas as pd
-import time
-from requests.exceptions import RequestException
-from http.client import RemoteDisconnected
-import random
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import install_nba_api_session
+
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
 
 class TimberwolvesRecords:
     def __init__(self):
@@ -22,20 +25,15 @@ class TimberwolvesRecords:
             'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA',
             'OREB', 'DREB', 'TOV', 'PF'
         ]
-        
-        # Maximum number of retries for API calls
-        self.max_retries = 3
     
     def get_top_10_players(self):
         """Get top 10 Timberwolves players by minutes played"""
         # Get player stats for current season
-        player_stats = self.api_call_with_retry(
-            lambda: LeagueDashPlayerStats(
-                team_id_nullable=self.team_id,
-                season='2024-25',
-                per_mode_detailed='Totals'
-            ).get_data_frames()[0]
-        )
+        player_stats = LeagueDashPlayerStats(
+            team_id_nullable=self.team_id,
+            season='2024-25',
+            per_mode_detailed='Totals'
+        ).get_data_frames()[0]
         
         # Sort by minutes and get top 10
         top_players = player_stats.nlargest(10, 'MIN')
@@ -45,24 +43,6 @@ class TimberwolvesRecords:
             
         return top_players['PLAYER_NAME'].tolist()
     
-    def api_call_with_retry(self, api_func, *args, **kwargs):
-        """Make API call with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                # Add randomized delay between attempts
-                if attempt > 0:
-                    delay = random.uniform(2, 5)
-                    print(f"Retry attempt {attempt + 1}, waiting {delay:.1f} seconds...")
-                    time.sleep(delay)
-                
-                return api_func(*args, **kwargs)
-                
-            except (RequestException, RemoteDisconnected) as e:
-                if attempt == self.max_retries - 1:  # Last attempt
-                    raise  # Re-raise the last exception
-                print(f"API call failed: {str(e)}, retrying...")
-                continue
-    
     def get_all_player_records(self):
         """Get records for top 10 Timberwolves players across all stats"""
         all_records = []
@@ -70,17 +50,13 @@ class TimberwolvesRecords:
         
         for player_name in roster:
             print(f"\nProcessing {player_name}...")
-            for stat in self.stat_categories:
-                print(f"Getting {stat} records...")
-                try:
-                    records_df = self.get_player_records(player_name, stat)
-                    all_records.append(records_df)
-                    # Randomized delay between 1 and 3 seconds
-                    delay = random.uniform(1, 3)
-                    time.sleep(delay)
-                except Exception as e:
-                    print(f"Error processing {player_name} for {stat}: {str(e)}")
-                    continue
+            try:
+                # One game log and one career table per player covers every stat category
+                records_df = self.get_player_records_batch(player_name, self.stat_categories)
+                all_records.append(records_df)
+            except Exception as e:
+                print(f"Error processing {player_name}: {str(e)}")
+                continue
         
         # Combine all records
         if all_records:
@@ -93,70 +69,56 @@ class TimberwolvesRecords:
     
     def get_player_records(self, player_name, stat='PTS'):
         """Get personal records comparison for a specific player"""
+        return self.get_player_records_batch(player_name, [stat])
+    
+    def get_player_records_batch(self, player_name, stats):
+        """Get personal records comparison for a player across several stats from one fetch"""
         # Get player ID
         player_info = players.find_players_by_full_name(player_name)[0]
         player_id = player_info['id']
         
-        # Get current stats and records with retry logic
-        current_stats = self._get_player_current_stats(player_id, stat)
-        personal_records = self._get_personal_records(player_id, stat)
-        
-        # Create records dataframe
-        records = []
-        for time_interval in ['game', 'season', 'all_time']:
-            records.append({
-                'time_interval': time_interval,
-                'player_comparison_level': 'personal',
-                'id': player_id,
-                'name': player_name,
-                'stat': stat.lower(),
-                'current': current_stats[time_interval],
-                'record': personal_records[time_interval]
-            })
+        game_log, career_stats = self._get_player_tables(player_id)
+        current_stats = self._get_player_current_stats(game_log, career_stats, stats)
+        personal_records = self._get_personal_records(game_log, career_stats, stats)
         
-        return pd.DataFrame(records)
+        # Create records dataframe: one row per stat and time interval
+        time_intervals = ['game', 'season', 'all_time']
+        records = pd.DataFrame({
+            'time_interval': time_intervals * len(stats),
+            'player_comparison_level': 'personal',
+            'id': player_id,
+            'name': player_name,
+            'stat': [stat.lower() for stat in stats for _ in time_intervals],
+            'current': current_stats[stats].T.to_numpy().ravel(),
+            'record': personal_records[stats].T.to_numpy().ravel()
+        })
+        return records
     
-    def _get_player_current_stats(self, player_id, stat):
-        """Get current statistics for a player"""
-        # Get most recent game stat with retry
-        game_log = self.api_call_with_retry(
-            lambda: PlayerGameLog(player_id=player_id).get_data_frames()[0]
-        )
-        current_game = game_log.iloc[0][stat] if not game_log.empty else 0
-        
-        # Get current season and career totals with retry
-        career_stats = self.api_call_with_retry(
-            lambda: PlayerCareerStats(player_id=player_id).get_data_frames()[0]
-        )
-        current_season = career_stats.iloc[-1][stat] if not career_stats.empty else 0
-        career_total = career_stats[stat].sum() if not career_stats.empty else 0
-        
-        return {
-            'game': current_game,
-            'season': current_season,
-            'all_time': career_total
-        }
+    def _get_player_tables(self, player_id):
+        """Fetch a player's game log and season-by-season career table"""
+        game_log = PlayerGameLog(player_id=player_id).get_data_frames()[0]
+        career_stats = PlayerCareerStats(player_id=player_id).get_data_frames()[0]
+        return game_log, career_stats
     
-    def _get_personal_records(self, player_id, stat):
-        """Get personal records for a player"""
-        # Game high with retry
-        game_log = self.api_call_with_retry(
-            lambda: PlayerGameLog(player_id=player_id).get_data_frames()[0]
-        )
-        game_high = game_log[stat].max() if not game_log.empty else 0
-        
-        # Season high and career total with retry
-        career_stats = self.api_call_with_retry(
-            lambda: PlayerCareerStats(player_id=player_id).get_data_frames()[0]
-        )
-        season_high = career_stats[stat].max() if not career_stats.empty else 0
-        career_total = career_stats[stat].sum() if not career_stats.empty else 0
-        
-        return {
-            'game': game_high,
-            'season': season_high,
-            'all_time': career_total
-        }
+    def _get_player_current_stats(self, game_log, career_stats, stats):
+        """Current statistics for a player, one row per time interval"""
+        zeros = pd.Series(0, index=stats)
+        # Most recent game, current season and career totals
+        return pd.DataFrame({
+            'game': game_log.iloc[0][stats] if not game_log.empty else zeros,
+            'season': career_stats.iloc[-1][stats] if not career_stats.empty else zeros,
+            'all_time': career_stats[stats].sum() if not career_stats.empty else zeros
+        }).T
+    
+    def _get_personal_records(self, game_log, career_stats, stats):
+        """Personal records for a player, one row per time interval"""
+        zeros = pd.Series(0, index=stats)
+        # Game high, season high and career total
+        return pd.DataFrame({
+            'game': game_log[stats].max() if not game_log.empty else zeros,
+            'season': career_stats[stats].max() if not career_stats.empty else zeros,
+            'all_time': career_stats[stats].sum() if not career_stats.empty else zeros
+        }).T
 
 # Example usage
 def main():
@@ -3,6 +3,14 @@ import pandas as pd
 from nba_api.stats.endpoints import playergamelog
 from nba_api.stats.static import players, teams
 from nba_api.stats.endpoints import commonteamroster
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import install_nba_api_session
+
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
 
 # Function to get player ID
 def get_player_id(player_name):
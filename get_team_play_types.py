@@ -1,12 +1,13 @@
-import requests
+import os
+import sys
 import pandas as pd
 import sqlite3
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
+
 def process_data(data):
-    # Assuming 'resultSets' key in the response; adjust as per actual response structure
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
+    df = nba_http.process_data(data)
     #calculate poss_pct rank for each playtype
     df['POSS_PCT_RANK'] = df['POSS_PCT'].rank(ascending=False)
     #multiply percentile by 30 and round down to get PPP_rank
@@ -27,23 +28,6 @@ params = {
     "TypeGrouping": "defensive"
 }
 
-# Headers to mimic a request from a web browser
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Chromium\";v=\"122\", \"Not(A:Brand\";v=\"24\", \"Google Chrome\";v=\"122\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site"
-}
 
 play_types = ['OffScreen', 'Isolation', 'Transition', 'Postup', 'Spotup',
               'Handoff', 'Cut', 'OffRebound', 'Misc', 'PRRollman', 'PRBallHandler']
@@ -52,7 +36,7 @@ play_types = ['OffScreen', 'Isolation', 'Transition', 'Postup', 'Spotup',
 df_list = []
 for play_type in play_types:
     params['PlayType'] = play_type
-    data = requests.get(url, headers=headers, params=params).json()
+    data = nba_http.fetch_nba_data(url, params)
     df_list.append(process_data(data))
 
 df = pd.concat(df_list)
@@ -61,7 +45,7 @@ df_offensive_list = []
 params['TypeGrouping'] = 'offensive'
 for play_type in play_types:
     params['PlayType'] = play_type
-    data = requests.get(url, headers=headers, params=params).json()
+    data = nba_http.fetch_nba_data(url, params)
     df_offensive_list.append(process_data(data))
 
 df_offensive = pd.concat(df_offensive_list)
@@ -1,36 +1,27 @@
-import requests
+import os
+import sys
 import pandas as pd
 import sqlite3
-import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
+from common.resultsets import loads, to_frame
 
-def fetch_and_process_data(url, headers):
+
+def fetch_and_process_data(url):
     try:
-        response = requests.get(url, headers=headers)
+        response = nba_http.get(url)
         response.raise_for_status()
-        data = response.json()
-        # Access the JSON structure here to fetch result sets as required
-        headers = data['pageProps']['data']['resultSets'][0]['headers']
-        rows = data['pageProps']['data']['resultSets'][0]['rowSet']
-        df = pd.DataFrame(rows, columns=headers)
-        return df
+        data = loads(response.content)
+        # The stats payload is nested inside the Next.js page props
+        return to_frame(data['pageProps']['data'])
     except Exception as e:
         print(f"Failed to retrieve data from {url}: {e}")
         return pd.DataFrame()
 
 
-# Base URL and headers for requests
+# Base URL for requests
 base_url = "https://www.nba.com/_next/data/5TJ1HMfFntBMF9Rwhi_OT/en/stats"
-headers = {
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Connection": "keep-alive",
-    "Host": "www.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
-}
 
 # Define the tracking types and entities to iterate over
 tracking_types = ['Drives', 'Defense', 'CatchShoot', 'Passing', 'Possessions', 'PullUpShot', 'Rebounding', 'Efficiency',
@@ -48,7 +39,7 @@ for tracking_type in tracking_types:
         print(f"Requesting data for {tracking_type} - {entity}")
 
         # Fetch and process data
-        df = fetch_and_process_data(url, headers)
+        df = fetch_and_process_data(url)
 
         # If data is available, save to the database with a unique table name
         if not df.empty:
@@ -58,8 +49,5 @@ for tracking_type in tracking_types:
         else:
             print(f"No data available for {tracking_type} - {entity}")
 
-        # Delay to avoid request rate limits
-        time.sleep(1)
-
 # Close the database connection
 conn.close()
@@ -1,5 +1,13 @@
 import pandas as pd
 from nba_api.stats.endpoints import leaguedashlineups
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import install_nba_api_session
+
+# Throttled, retried and cached by the shared stats.nba.com session
+install_nba_api_session()
 
 # Fetch data using nba_api
 lineup_data = leaguedashlineups.LeagueDashLineups(
@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 import datetime
-import pandas as pd
-import time
-import re
-from nba_api.stats.endpoints import leaguedashlineups
+import logging
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from lineups.season import build_league_stints, combination_totals, season_game_ids
 
 
 def get_current_season():
@@ -21,91 +23,32 @@ def get_current_season():
     return f"{season_start}-{str(season_end)[-2:]}"
 
 
-def fetch_lineup_data_paginated(lineup_size, season_str):
-    all_data = []
-    teams = [1610612750]  # You should include all 30 teams
-
-    for team_id in teams:
-        print(f"Fetching {lineup_size}-man lineup data for team {team_id}")
-        lineup = leaguedashlineups.LeagueDashLineups(
-            group_quantity=lineup_size,
-            season=season_str,
-            season_type_all_star='Regular Season',
-            #measure_type_detailed_defense='Advanced',
-            team_id_nullable=team_id
-        )
-
-        df = lineup.get_data_frames()[0]
-        if not df.empty:
-            df['LINEUP_SIZE'] = lineup_size  # Add the column here
-            all_data.append(df)
-
-        time.sleep(1)  # Avoid rate-limiting
-
-    return pd.concat(all_data, ignore_index=True) if all_data else None
-
-
-
-def split_players(group_name):
-    """
-    Splits a string containing player names using " - " as the delimiter.
-    This ensures that names like "Nickeil Alexander-Walker" remain intact.
-
-    :param group_name: str, the original string from the group_name column.
-    :return: list of player names.
-    """
-    return re.split(r'\s+-\s+', group_name)
-
-
 def main():
+    logging.basicConfig(level=logging.INFO)
     season_str = get_current_season()
     lineup_sizes = [2, 3, 5]
-    all_lineups = []
-
-    # Fetch data for each lineup size and save individual CSV files.
-    for size in lineup_sizes:
-        try:
-            df = fetch_lineup_data_paginated(size, season_str)
-            if df is None:
-                continue
-
-            # Optional: print out the columns for debugging.
-            print(f"Columns for {size}-man lineup: {df.columns.tolist()}")
-
-            csv_file = f"lineup_data_{size}man_{season_str}.csv"
-            df.to_csv(csv_file, index=False)
-            print(f"Saved {size}-man lineup data to {csv_file}")
-            all_lineups.append(df)
 
-            time.sleep(1)  # Pause briefly between requests.
-        except Exception as e:
-            print(f"Error fetching {size}-man lineup data: {e}")
+    # Every team's lineups from the season's play-by-play, computed locally: one stint
+    # table for all completed games (built across a process pool), then 2-, 3- and 5-man
+    # combination totals. Only games missing from the game archive are downloaded.
+    table, slots = build_league_stints(season_game_ids(season_str))
+    combined_df = combination_totals(table, slots, sizes=lineup_sizes)
 
-    # Combine all the lineup data into a single DataFrame.
-    if all_lineups:
-        combined_df = pd.concat(all_lineups, ignore_index=True)
-        combined_csv = f"combined_basic_lineup_data_{season_str}.csv"
-
-        # Check for the group_name column (if it's uppercase, rename it for consistency)
-        if 'group_name' not in combined_df.columns and 'GROUP_NAME' in combined_df.columns:
-            combined_df.rename(columns={'GROUP_NAME': 'group_name'}, inplace=True)
-
-        if 'group_name' in combined_df.columns:
-            # Create a temporary column with the split list of player names.
-            combined_df['players_list'] = combined_df['group_name'].apply(split_players)
-
-            # Assume a maximum of 5 players per group; create new columns player1 to player5.
-            for i in range(5):
-                combined_df[f'player{i + 1}'] = combined_df['players_list'].apply(
-                    lambda players: players[i] if len(players) > i else None
-                )
-            # Optionally, remove the temporary players_list column.
-            combined_df.drop(columns=['players_list'], inplace=True)
-        else:
-            print("Column 'group_name' not found in the combined dataframe. Skipping player splitting.")
-
-        combined_df.to_csv(combined_csv, index=False)
-        print(f"Combined lineup data with split player columns saved to {combined_csv}")
+    # Save individual CSV files for each lineup size.
+    for size in lineup_sizes:
+        df = combined_df[combined_df['LINEUP_SIZE'] == size]
+        csv_file = f"lineup_data_{size}man_{season_str}.csv"
+        df.to_csv(csv_file, index=False)
+        print(f"Saved {len(df)} {size}-man lineups to {csv_file}")
+
+    # Lookup from each team's lineup_key bits back to the players
+    slots_csv = f"lineup_slots_{season_str}.csv"
+    slots.table().to_csv(slots_csv, index=False)
+    print(f"Lineup key lookup table saved to {slots_csv}")
+
+    combined_csv = f"combined_basic_lineup_data_{season_str}.csv"
+    combined_df.rename(columns={'GROUP_NAME': 'group_name'}).to_csv(combined_csv, index=False)
+    print(f"Combined lineup data with player columns saved to {combined_csv}")
 
 
 if __name__ == '__main__':
@@ -1,12 +1,9 @@
-import requests
-import pandas as pd
+import os
+import sys
 
-def process_data(data):
-    # Assuming 'resultSets' key in the response; adjust as per actual response structure
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
-    return df
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
+from common.nba_http import process_data
 
 # The URL from which to fetch data
 url = "https://stats.nba.com/stats/teamgamelogs"
@@ -40,26 +37,8 @@ params = {
     "VsDivision": "",
 }
 
-# Headers to mimic a request from a web browser
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Chromium\";v=\"122\", \"Not(A:Brand\";v=\"24\", \"Google Chrome\";v=\"122\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site"
-}
-
 # Making the GET request
-response = requests.get(url, headers=headers, params=params)
+response = nba_http.get(url, params=params)
 
 # Checking if the request was successful
 if response.status_code == 200:
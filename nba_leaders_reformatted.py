@@ -1,27 +1,15 @@
-import requests
+import os
+import sys
 import pandas as pd
 from openpyxl import load_workbook
-import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
+from common.fetch_engine import FetchJob, fetch_all
 
 EXCEL_FILENAME = '/Users/tonysantoorjian/Documents/nba_player_stats.xlsx'
 NBA_STATS_URL = "https://stats.nba.com/stats/leaguedashplayerstats"
 NBA_SYNERGY_URL = 'https://stats.nba.com/stats/synergyplaytypes'
-HEADERS = {
-    "Accept": "application/json",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Not A Brand\";v=\"99\", \"Google Chrome\";v=\"121\", \"Chromium\";v=\"121\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-}
 # Common rank columns
 rank_columns = [
     "GP_RANK", "W_RANK", "L_RANK", "W_PCT_RANK", "MIN_RANK",
@@ -82,9 +70,7 @@ def get_params(stats_type, last_n_games=None, play_type=None):
         raise ValueError("Invalid stats type specified.")
 
 def process_data(data, filter_criteria):
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
+    df = nba_http.process_data(data)
     for column, value in filter_criteria.items():
         if column in df.columns:
             df = df[df[column] >= value]
@@ -105,25 +91,6 @@ def rank_players(df, rank_columns, fields_to_rank=None):
     return df
 
 
-def fetch_nba_data(url, headers, params):
-    print(f"Making API call to: {url}")
-    print(f"With headers: {headers}")
-    print(f"And parameters: {params}")
-
-    response = requests.get(url, headers=headers, params=params)
-    print(f"Response status code: {response.status_code}")
-
-    if response.status_code == 200:
-        try:
-            return response.json()
-        except ValueError as e:  # JSON decoding error
-            print(f"Error decoding JSON: {e}")
-            return None
-    else:
-        print(f"Failed to fetch data: {response.status_code}, Response: {response.text}")
-        return None
-
-
 def generate_summary_tab(excel_filename):
     if not os.path.exists(excel_filename):
         print(f"Error: The file {excel_filename} does not exist.")
@@ -198,37 +165,7 @@ def main():
     # DataFrame to collect all top 10 ranks
     top_10_ranks_df_pieces = []
 
-    # Regular stats processing
-    for measure_type in ["Advanced", "Base"]:
-        for last_n_games in ['5', '10']:
-            params = get_params('regular', last_n_games=last_n_games)
-            params["MeasureType"] = measure_type
-
-            data = fetch_nba_data(regular_stats_url, HEADERS, params)
-            if data:
-                gp_threshold = 4 if last_n_games == '5' else 8
-                df_filtered = process_data(data, {'MIN': 20, 'GP': gp_threshold})
-
-                # Select rank columns based on MeasureType
-                rank_columns_to_use = rank_columns if measure_type == "Advanced" else rank_columns2
-                df_ranked = rank_players(df_filtered, rank_columns_to_use)
-
-                # Filter for Timberwolves players and extract top 10 ranks
-                df_timberwolves_top_ranks = df_ranked[df_ranked['PLAYER_NAME'].isin(timberwolves_players)]
-
-                # Iterate over the ranking columns and capture the rank and the corresponding value
-                for col in rank_columns_to_use:
-                    if '_RANK' in col:
-                        stat_name = col.replace('_RANK', '')
-                        top_ranks = df_timberwolves_top_ranks[
-                            df_timberwolves_top_ranks[col] <= 10
-                            ][['PLAYER_NAME', col, stat_name]].copy()  # Capture both rank and stat value
-                        top_ranks.rename(columns={col: 'Rank', stat_name: 'Stat_Value'}, inplace=True)
-                        top_ranks['Stat'] = stat_name
-                        top_ranks['Timeframe'] = f'Last {last_n_games} {measure_type}'
-                        top_10_ranks_df_pieces.append(top_ranks)
-
-    # Play type stats processing
+    # Play types and the fields ranked for each of them
     play_types = ['OffScreen', 'Isolation', 'Transition', 'Postup', 'Spotup',
                   'Handoff', 'Cut', 'OffRebound', 'Misc', 'PRRollman', 'PRBallHandler']
     fields_to_rank_playtypes = [
@@ -236,9 +173,57 @@ def main():
         "PLUSONE_POSS_PCT", "SCORE_POSS_PCT", "EFG_PCT", "POSS", "PTS", "FGM", "FGA", "FGMX"
     ]
 
+    # Build every request up front and fetch them concurrently
+    jobs = []
+    for measure_type in ["Advanced", "Base"]:
+        for last_n_games in ['5', '10']:
+            params = get_params('regular', last_n_games=last_n_games)
+            params["MeasureType"] = measure_type
+            jobs.append(FetchJob(('regular', measure_type, last_n_games), regular_stats_url, params))
     for play_type in play_types:
         params = get_params('playtype', play_type=play_type)
-        data = fetch_nba_data(playtype_stats_url, HEADERS, params)
+        jobs.append(FetchJob(('playtype', play_type), playtype_stats_url, params))
+
+    results = fetch_all(jobs)
+    for result in results:
+        if not result.ok:
+            print(f"Skipping {result.key}: {result.error}")
+
+    # Regular stats processing
+    for result in results:
+        if result.key[0] != 'regular' or not result.ok:
+            continue
+        _, measure_type, last_n_games = result.key
+        data = result.data
+        if data:
+            gp_threshold = 4 if last_n_games == '5' else 8
+            df_filtered = process_data(data, {'MIN': 20, 'GP': gp_threshold})
+
+            # Select rank columns based on MeasureType
+            rank_columns_to_use = rank_columns if measure_type == "Advanced" else rank_columns2
+            df_ranked = rank_players(df_filtered, rank_columns_to_use)
+
+            # Filter for Timberwolves players and extract top 10 ranks
+            df_timberwolves_top_ranks = df_ranked[df_ranked['PLAYER_NAME'].isin(timberwolves_players)]
+
+            # Iterate over the ranking columns and capture the rank and the corresponding value
+            for col in rank_columns_to_use:
+                if '_RANK' in col:
+                    stat_name = col.replace('_RANK', '')
+                    top_ranks = df_timberwolves_top_ranks[
+                        df_timberwolves_top_ranks[col] <= 10
+                        ][['PLAYER_NAME', col, stat_name]].copy()  # Capture both rank and stat value
+                    top_ranks.rename(columns={col: 'Rank', stat_name: 'Stat_Value'}, inplace=True)
+                    top_ranks['Stat'] = stat_name
+                    top_ranks['Timeframe'] = f'Last {last_n_games} {measure_type}'
+                    top_10_ranks_df_pieces.append(top_ranks)
+
+    # Play type stats processing
+    for result in results:
+        if result.key[0] != 'playtype' or not result.ok:
+            continue
+        _, play_type = result.key
+        data = result.data
         if data:
             df_filtered = process_data(data, {'POSS': 20})
             df_ranked = rank_players(df_filtered, rank_columns=[], fields_to_rank=fields_to_rank_playtypes)
@@ -1,19 +1,14 @@
-import requests
+import os
+import sys
 import pandas as pd
 from openpyxl import load_workbook
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common import nba_http
 
 
-
-def fetch_nba_data(url, headers, params):
-    response = requests.get(url, headers=headers, params=params)
-    data = response.json()
-    return data
-
 def process_data(data, min_minutes, min_games):
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
+    df = nba_http.process_data(data)
     df_filtered = df[(df['MIN'] >= min_minutes) & (df['GP'] >= min_games)]
     return df_filtered
 
@@ -79,25 +74,9 @@ def generate_summary_tab(excel_filename):
     else:
         print("No top 10 ranks found.")
 
-# Common headers and URL
+# Stats URL
 url = "https://stats.nba.com/stats/leaguedashplayerstats"
 url2 = 'https://stats.nba.com/stats/synergyplaytypes'
-headers = {
-    "Accept": "application/json",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "Connection": "keep-alive",
-    "Host": "stats.nba.com",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Not A Brand\";v=\"99\", \"Google Chrome\";v=\"121\", \"Chromium\";v=\"121\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-}
 params1 = {
     "College": "",
     "Conference": "",
@@ -186,24 +165,24 @@ params4 = params2.copy()
 params4['MeasureType'] = "Base"  # Adjusting the last N games parameter
 
 # Fetch and process the first set of data
-data1 = fetch_nba_data(url, headers, params1)
+data1 = nba_http.fetch_nba_data(url, params1)
 df_filtered1 = process_data(data1, min_minutes=20, min_games=4)
 df_ranked1 = rank_players(df_filtered1, rank_columns)
 save_to_excel(df_ranked1, '/Users/tonysantoorjian/Documents/nba_player_stats.xlsx', 'Last 5 Advanced')
 
 # Fetch and process the second set of data
-data2 = fetch_nba_data(url, headers, params2)
+data2 = nba_http.fetch_nba_data(url, params2)
 df_filtered2 = process_data(data2, min_minutes=20, min_games=8)
 df_ranked2 = rank_players(df_filtered2, rank_columns)
 save_to_excel(df_ranked2, '/Users/tonysantoorjian/Documents/nba_player_stats.xlsx', 'Last 10 Advanced')
 
-data3 = fetch_nba_data(url, headers, params3)
+data3 = nba_http.fetch_nba_data(url, params3)
 df_filtered3 = process_data(data3, min_minutes=20, min_games=4)
 df_ranked3 = rank_players(df_filtered3, rank_columns2)
 save_to_excel(df_ranked3, '/Users/tonysantoorjian/Documents/nba_player_stats.xlsx', 'Last 5 Basic')
 
 # Fetch and process the second set of data
-data4 = fetch_nba_data(url, headers, params4)
+data4 = nba_http.fetch_nba_data(url, params4)
 df_filtered4 = process_data(data4, min_minutes=20, min_games=8)
 df_ranked4 = rank_players(df_filtered4, rank_columns2)
 save_to_excel(df_ranked4, '/Users/tonysantoorjian/Documents/nba_player_stats.xlsx', 'Last 10 Basic')
@@ -225,10 +204,8 @@ for x in playtypes:
         "SeasonYear": "2023-24",
         "TypeGrouping": "offensive"
     }
-    data5 = fetch_nba_data(url2, headers, params5)
-    headers_df = data5['resultSets'][0]['headers']
-    rows = data5['resultSets'][0]['rowSet']
-    df5 = pd.DataFrame(rows, columns=headers_df)
+    data5 = nba_http.fetch_nba_data(url2, params5)
+    df5 = nba_http.process_data(data5)
     df_filtered5 = df5[(df5['POSS'] >= 20)]
 
     # Calculate ranks for specified fields and append them to the dataframe
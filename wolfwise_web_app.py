@@ -1,59 +1,22 @@
-import requests
+import os
+import sys
 import pandas as pd
 import numpy as np
-import io
 from nba_api.stats.static import teams
-from nba_api.stats.endpoints import leaguegamefinder
-import requests
-import pandas as pd
 from openpyxl import load_workbook
 import sqlite3  # Import sqlite3 module
 
-# get game logs from the reg season
-gamefinder = leaguegamefinder.LeagueGameFinder(season_nullable='2024-25',
-                                              league_id_nullable='00',
-                                              season_type_nullable='Regular Season')
-games = gamefinder.get_data_frames()[0]
-# Get a list of distinct game ids
-game_ids = games['GAME_ID'].unique().tolist()
-
-# Filter to TEAM_ABBREVIATION == 'MIN' and get the game ids
-games = games[games['TEAM_ABBREVIATION'] == 'MIN']
-game_ids = games['GAME_ID'].unique().tolist()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aaWolfWiseETL'))
+from common.nba_http import fetch_nba_data
+from common.schedule import latest_game_id
+from live.pubsub import LiveStatLines
 
-# Grab the most recent game
-game_id = game_ids[0]
+# Most recent Timberwolves game from the cached season schedule
+game_id = latest_game_id('MIN', season='2024-25', season_type='Regular Season')
 
 
-def fetch_nba_data(url, headers):
-    response = requests.get(url, headers=headers)
-    data = response.json()
-    return data
-
-def process_data(data):
-    headers = data['resultSets'][0]['headers']
-    rows = data['resultSets'][0]['rowSet']
-    df = pd.DataFrame(rows, columns=headers)
-    return df
-
-# Common headers and URL
+# Boxscore URL
 url = f"https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
-headers = {
-    "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
-    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
-    "If-Modified-Since": "Tue, 05 Mar 2024 05:22:46 GMT",
-    "If-None-Match": "\"b1614aabd398e87ca9e79f1f64eef0f7\"",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-    "Sec-Ch-Ua": "\"Chromium\";v=\"122\", \"Not(A:Brand\";v=\"24\", \"Google Chrome\";v=\"122\"",
-    "Sec-Ch-Ua-Mobile": "?0",
-    "Sec-Ch-Ua-Platform": "\"macOS\"",
-    "Sec-Fetch-Dest": "empty",
-    "Sec-Fetch-Mode": "cors",
-    "Sec-Fetch-Site": "same-site",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-}
 
 # Function to create a DataFrame from team data
 def create_team_stats_df(team_data):
@@ -77,7 +40,7 @@ def create_team_stats_df(team_data):
     df = pd.DataFrame(players_data)
     return df
 
-data = fetch_nba_data(url, headers)
+data = fetch_nba_data(url, revalidate=True)
 # Extract the away team players' stats (assuming 'awayTeam' is 'MIN')
 players_data = data["game"]["homeTeam"]["players"]
 
@@ -210,8 +173,19 @@ def get_player_data_from_db():
         df = pd.read_sql_query(query, conn)
     return df
 
-# Fetch dynamic player data and update Players and stat_options
-players = get_player_data_from_db()
+@st.cache_resource
+def get_live_stat_lines(url):
+    # One subscription per app process, patched in place as the live pipeline publishes changed cells
+    return LiveStatLines(url)
+
+# Fetch dynamic player data and update Players and stat_options; during a game the
+# live pipeline's change feed is used when WOLFWISE_LIVE_URL points at it
+live_url = os.getenv('WOLFWISE_LIVE_URL')
+live_rows = get_live_stat_lines(live_url).rows() if live_url else []
+if live_rows:
+    players = pd.DataFrame(live_rows)
+else:
+    players = get_player_data_from_db()
 
 # Convert the DataFrame to a list of dictionaries if needed
 players = players.to_dict(orient="records")